@@ -4,35 +4,72 @@
 """
 
 import requests
-import json
-import time
+from requests.adapters import HTTPAdapter
+import orjson
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from download_pcc_data import TokenBucket, load_progress_log, retry_request
 
-def download_2026_data():
-    """下載 2026 年所有標案資料"""
+BASE_URL = "https://pcc-api.openfun.app/api"
+
+CATEGORIES = {
+    "工程類": "engineering",
+    "財物類": "goods",
+    "勞務類": "services",
+}
+
+# 輸入檔小於此大小時不啟動多行程，直接單行程拆分
+PARALLEL_SPLIT_MIN_SIZE = 64 << 20
+
+
+@retry_request()
+def get_with_retry(session, url, params=None, rate_limiter=None):
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    return session.get(url, params=params, timeout=30)
+
+
+def fetch_date(session, date_str, rate_limiter=None):
+    """下載單日標案列表（於工作執行緒中執行）"""
+    response = get_with_retry(session, f"{BASE_URL}/listbydate", {"date": date_str}, rate_limiter)
+    response.raise_for_status()
+    result = response.json()
+    return result.get('records', []) if isinstance(result, dict) else []
+
+
+def download_2026_data(max_workers=8, save_interval=10, rate_limit=10):
+    """
+    下載 2026 年所有標案資料
+    
+    Args:
+        max_workers: 同時下載的執行緒數
+        save_interval: 每下載多少天儲存一次進度
+        rate_limit: 所有執行緒合計每秒最多請求數，0 或 None 表示不限速
+    """
     
-    BASE_URL = "https://pcc-api.openfun.app/api"
     OUTPUT_DIR = Path("pcc_data/2026")
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     
     session = requests.Session()
     session.headers.update({
-        'User-Agent': 'PCC-Data-Downloader/1.0'
+        'User-Agent': 'PCC-Data-Downloader/1.0',
+        'Connection': 'keep-alive'
     })
+    # 每個執行緒各保留一條長連線
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, pool_block=True))
+    rate_limiter = TokenBucket(rate_limit) if rate_limit else None
     
-    # 進度檔案
+    # 進度檔案：已完成日期逐行追加於 .log，統計資訊存於 .json
     progress_file = OUTPUT_DIR / "download_progress.json"
+    progress_log_file = OUTPUT_DIR / "download_progress.log"
     output_file = OUTPUT_DIR / "tenders_2026.jsonl"
     
     # 載入已下載的日期
-    downloaded_dates = set()
-    if progress_file.exists():
-        with open(progress_file, 'r') as f:
-            progress = json.load(f)
-            downloaded_dates = set(progress.get('downloaded_dates', []))
+    downloaded_dates, new_dates = load_progress_log(progress_log_file, progress_file)
     
     # 2026 年日期範圍 (到今天)
     start_date = datetime(2026, 1, 1)
@@ -45,70 +82,68 @@ def download_2026_data():
     print(f"輸出目錄: {OUTPUT_DIR}")
     print()
     
+    # 待下載日期
+    pending_dates = []
     current_date = start_date
+    while current_date <= end_date:
+        date_str = current_date.strftime("%Y%m%d")
+        if date_str in downloaded_dates:
+            print(f"[跳過] {date_str} - 已下載")
+        else:
+            pending_dates.append(date_str)
+        current_date += timedelta(days=1)
+    # 已下載日期只用於產生待下載清單，之後不再保留整個集合
+    del downloaded_dates
+    
     total_count = 0
+    completed = 0
     
-    # 開啟輸出檔案（追加模式）
-    with open(output_file, 'a', encoding='utf-8') as f:
-        while current_date <= end_date:
-            date_str = current_date.strftime("%Y%m%d")
-            
-            if date_str in downloaded_dates:
-                print(f"[跳過] {date_str} - 已下載")
-                current_date += timedelta(days=1)
-                continue
-            
-            print(f"[下載] {date_str}...", end=" ")
-            
-            try:
-                url = f"{BASE_URL}/listbydate"
-                params = {"date": date_str}
-                
-                for attempt in range(3):
-                    try:
-                        response = session.get(url, params=params, timeout=30)
-                        
-                        if response.status_code == 429:
-                            wait_time = 10 * (attempt + 1)
-                            print(f"(請求過快，等待 {wait_time} 秒)")
-                            time.sleep(wait_time)
-                            continue
-                        
-                        response.raise_for_status()
-                        break
-                    except requests.exceptions.Timeout:
-                        if attempt < 2:
-                            time.sleep(5)
-                            continue
-                        raise
-                
-                result = response.json()
-                records = result.get('records', []) if isinstance(result, dict) else []
+    def fetch(date_str):
+        try:
+            return date_str, fetch_date(session, date_str, rate_limiter), None
+        except Exception as e:
+            return date_str, None, e
+    
+    def save_progress(progress_log):
+        if new_dates:
+            progress_log.write(''.join(f"{date_str}\n" for date_str in new_dates))
+            progress_log.flush()
+            new_dates.clear()
+        progress_file.write_bytes(orjson.dumps({
+            'total_count': total_count,
+            'last_update': datetime.now().isoformat()
+        }, option=orjson.OPT_INDENT_2))
+    
+    # 多執行緒下載，由主執行緒依日期順序寫檔（追加模式，1 MiB 寫入緩衝）
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    with open(output_file, 'ab', buffering=1 << 20) as f, \
+         open(progress_log_file, 'a', encoding='utf-8') as progress_log:
+        try:
+            for date_str, records, error in executor.map(fetch, pending_dates):
+                if error is not None:
+                    print(f"[下載] {date_str}... ✗ 錯誤: {error}")
+                    continue
                 
                 if records:
                     for record in records:
                         record['_download_date'] = date_str
-                        f.write(json.dumps(record, ensure_ascii=False) + '\n')
-                    f.flush()
+                    f.write(b''.join(orjson.dumps(record) + b'\n' for record in records))
                     total_count += len(records)
-                    print(f"✓ {len(records)} 筆")
+                    print(f"[下載] {date_str}... ✓ {len(records)} 筆")
                 else:
-                    print("✓ 無資料")
+                    print(f"[下載] {date_str}... ✓ 無資料")
                 
-                # 更新進度
-                downloaded_dates.add(date_str)
-                with open(progress_file, 'w') as pf:
-                    json.dump({
-                        'downloaded_dates': list(downloaded_dates),
-                        'total_count': total_count,
-                        'last_update': datetime.now().isoformat()
-                    }, pf, ensure_ascii=False, indent=2)
+                new_dates.append(date_str)
+                completed += 1
                 
-            except Exception as e:
-                print(f"✗ 錯誤: {e}")
-            
-            current_date += timedelta(days=1)
-            time.sleep(0.5)  # 避免過度請求
+                # 定期更新進度（先寫出資料，進度才不會超前於資料檔）
+                if completed % save_interval == 0:
+                    f.flush()
+                    save_progress(progress_log)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            f.flush()
+            save_progress(progress_log)
     
     print()
     print("=" * 60)
@@ -120,51 +155,118 @@ def download_2026_data():
     split_by_category(output_file, OUTPUT_DIR)
 
 
-def split_by_category(input_file, output_dir):
-    """依分類拆分資料"""
-    
-    print()
-    print("依分類拆分資料...")
+def _split_range(args):
+    """
+    將輸入檔 [start, end) 位元組範圍內的行依分類寫入各輸出檔（可於子行程中執行）
     
-    CATEGORIES = {
-        "工程類": "engineering",
-        "財物類": "goods", 
-        "勞務類": "services",
-    }
+    Args:
+        args: (input_file, start, end, out_paths)，start/end 須對齊行首，
+              out_paths 為 {分類: 輸出路徑}
     
-    # 建立分類目錄
-    for en_name in list(CATEGORIES.values()) + ["other"]:
-        (output_dir / en_name).mkdir(exist_ok=True)
-    
-    # 開啟所有輸出檔案
-    files = {}
-    for en_name in list(CATEGORIES.values()) + ["other"]:
-        files[en_name] = open(output_dir / en_name / "2026.jsonl", 'w', encoding='utf-8')
+    Returns:
+        各分類筆數
+    """
+    input_file, start, end, out_paths = args
     
-    stats = {name: 0 for name in list(CATEGORIES.values()) + ["other"]}
+    files = {name: open(path, 'wb') for name, path in out_paths.items()}
+    stats = dict.fromkeys(files, 0)
     
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    data = json.loads(line)
-                    category = data.get('brief', {}).get('category', '')
-                    
-                    # 判斷分類
-                    target = "other"
-                    for cn_name, en_name in CATEGORIES.items():
-                        if category and category.startswith(cn_name):
-                            target = en_name
-                            break
+        with open(input_file, 'rb') as f:
+            f.seek(start)
+            remaining = end - start
+            # 每次讀入約 16 MiB 的行，分類後各分類以一次 writelines 寫出
+            while remaining > 0:
+                lines = f.readlines(min(remaining, 1 << 24))
+                if not lines:
+                    break
+                # readlines 可能多讀到 end 之後的行（屬於下一段），丟掉
+                size_read = sum(map(len, lines))
+                while size_read > remaining:
+                    size_read -= len(lines.pop())
+                remaining -= size_read
+                
+                batches = {name: [] for name in files}
+                append = {name: batch.append for name, batch in batches.items()}
+                for line in lines:
+                    try:
+                        data = orjson.loads(line)
+                        category = data.get('brief', {}).get('category', '')
+                        
+                        # 判斷分類（分類名稱皆為 3 字前綴，直接以前 3 字查表）
+                        target = CATEGORIES.get(category[:3], "other") if category else "other"
+                    except:
+                        continue
                     
-                    files[target].write(line)
-                    stats[target] += 1
-                except:
-                    pass
+                    append[target](line)
+                
+                for name, batch in batches.items():
+                    files[name].writelines(batch)
+                    stats[name] += len(batch)
     finally:
         for fh in files.values():
             fh.close()
     
+    return stats
+
+
+def split_by_category(input_file, output_dir, workers=None):
+    """
+    依分類拆分資料
+    
+    大檔案依位元組範圍（對齊換行）切成 workers 段，由多個行程各自拆分成
+    分段檔，最後依序串接，輸出順序與單行程相同。
+    
+    Args:
+        workers: 行程數，預設為 CPU 核心數
+    """
+    
+    print()
+    print("依分類拆分資料...")
+    
+    names = list(CATEGORIES.values()) + ["other"]
+    
+    # 建立分類目錄
+    for en_name in names:
+        (output_dir / en_name).mkdir(exist_ok=True)
+    
+    out_paths = {name: output_dir / name / "2026.jsonl" for name in names}
+    size = os.path.getsize(input_file)
+    workers = workers or os.cpu_count() or 1
+    
+    if workers == 1 or size < PARALLEL_SPLIT_MIN_SIZE:
+        stats = _split_range((input_file, 0, size, out_paths))
+    else:
+        # 切點對齊到下一行的行首
+        offsets = [0]
+        with open(input_file, 'rb') as f:
+            for i in range(1, workers):
+                f.seek(max(size * i // workers, offsets[-1]))
+                f.readline()
+                offsets.append(min(f.tell(), size))
+        offsets.append(size)
+        ranges = [(s, e) for s, e in zip(offsets, offsets[1:]) if s < e]
+        
+        part_paths = [
+            {name: output_dir / name / f"2026.part{i}.jsonl" for name in names}
+            for i in range(len(ranges))
+        ]
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            results = list(executor.map(
+                _split_range,
+                [(input_file, s, e, parts) for (s, e), parts in zip(ranges, part_paths)]
+            ))
+        
+        # 依分段順序串接
+        stats = dict.fromkeys(names, 0)
+        for name in names:
+            with open(out_paths[name], 'wb') as out:
+                for parts, part_stats in zip(part_paths, results):
+                    with open(parts[name], 'rb') as part:
+                        shutil.copyfileobj(part, out, 1 << 20)
+                    os.remove(parts[name])
+                    stats[name] += part_stats[name]
+    
     print("分類完成！")
     for name, count in stats.items():
         print(f"  {name}: {count} 筆")
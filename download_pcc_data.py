@@ -7,55 +7,191 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import functools
+import gzip
+import itertools
 import json
+import orjson
+import random
+import threading
 import time
 import os
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
 
+def retry_request(max_retries=6, base_delay=1.0, max_delay=60.0):
+    """
+    HTTP 請求重試裝飾器（指數退避 + 隨機抖動）
+    
+    被裝飾的函式需回傳 requests.Response。遇到 429、5xx、逾時或連線錯誤時重試，
+    伺服器有給 Retry-After 時以其為準；重試用盡後回傳最後一次的回應
+    （由呼叫端 raise_for_status）或拋出最後一次的例外。
+    
+    Args:
+        max_retries: 最多嘗試次數
+        base_delay: 第一次重試的等待秒數，之後每次加倍
+        max_delay: 退避等待秒數上限（Retry-After 也以此為上限）
+    """
+    def backoff(attempt):
+        return min(max_delay, base_delay * 2 ** attempt) + random.uniform(0, 1)
+    
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(max_retries):
+                last_attempt = attempt == max_retries - 1
+                try:
+                    response = func(*args, **kwargs)
+                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                    if last_attempt:
+                        raise
+                    time.sleep(backoff(attempt))
+                    continue
+                
+                if response.status_code != 429 and response.status_code < 500:
+                    return response
+                if last_attempt:
+                    return response
+                
+                try:
+                    wait_time = min(float(response.headers['Retry-After']), max_delay) + random.uniform(0, 1)
+                except (KeyError, ValueError):
+                    wait_time = backoff(attempt)
+                print(f"      伺服器回應 {response.status_code}，等待 {wait_time:.1f} 秒後重試...")
+                time.sleep(wait_time)
+        return wrapper
+    return decorator
+
+
+class TokenBucket:
+    """
+    多執行緒共用的權杖桶限速器
+    
+    每秒補充 rate 個權杖，最多累積 rate 個（至少 1 個）；acquire() 取不到權杖時等待，
+    讓所有工作執行緒合計的請求速率不超過 rate，而不是每個執行緒各自固定休息。
+    """
+    
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.timestamp = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """取得一個權杖，必要時等待"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.timestamp) * self.rate)
+            self.timestamp = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            # 持鎖等待，其他執行緒依序排在後面
+            time.sleep((1 - self.tokens) / self.rate)
+            self.tokens = 0
+            self.timestamp = time.monotonic()
+
+
+def load_progress_log(log_file, legacy_progress_file=None, legacy_key='downloaded_dates'):
+    """
+    讀取追加式進度紀錄檔（每行一個已完成的日期或標案 ID）
+    
+    舊版進度檔把整個列表存在 JSON 的 legacy_key 欄位中；若提供
+    legacy_progress_file，其中尚未寫入紀錄檔的項目也會一併讀入。
+    
+    Returns:
+        (已完成的項目集合, 尚未寫入紀錄檔的項目列表)
+    """
+    done = set()
+    if log_file.exists():
+        done.update(log_file.read_text(encoding='utf-8').splitlines())
+    
+    unsaved = []
+    if legacy_progress_file is not None and legacy_progress_file.exists():
+        legacy_items = orjson.loads(legacy_progress_file.read_bytes()).get(legacy_key, [])
+        unsaved = sorted(set(legacy_items) - done)
+        done.update(unsaved)
+    
+    return done, unsaved
+
+
+def open_jsonl(path, mode='rb'):
+    """
+    以二進位模式開啟 JSONL 檔；副檔名為 .gz 時以 gzip 讀寫
+
+    gzip 以追加模式寫入時會新增一個 member，多個 member 串接後仍可直接逐行讀取，
+    因此斷點續傳照常運作。
+    """
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode, compresslevel=3)
+    return open(path, mode, buffering=1 << 20)
+
+
+def bounded_map(executor, func, iterable, window):
+    """
+    與 executor.map 相同，依輸入順序回傳結果，但最多只有 window 個工作在排隊或執行中
+
+    executor.map 會先把整個 iterable 取完並全部送出；這裡邊取邊送，
+    輸入可以是逐行讀檔的產生器，記憶體用量不隨輸入筆數成長。
+    """
+    iterator = iter(iterable)
+    pending = deque(executor.submit(func, item) for item in itertools.islice(iterator, window))
+    while pending:
+        result = pending.popleft().result()
+        for item in itertools.islice(iterator, 1):
+            pending.append(executor.submit(func, item))
+        yield result
+
+
 class PCCDownloader:
     """政府採購網資料下載器"""
     
     BASE_URL = "https://pcc-api.openfun.app/api"
     
-    def __init__(self, output_dir="pcc_data"):
+    def __init__(self, output_dir="pcc_data", max_connections=32, compress=False, rate_limit=10):
         """
         初始化下載器
         
         Args:
             output_dir: 資料輸出目錄
+            max_connections: 連線池大小（應不小於同時下載的執行緒數）
+            compress: 標案列表以 gzip 壓縮存為 all_tenders.jsonl.gz
+            rate_limit: 所有執行緒合計每秒最多請求數，0 或 None 表示不限速
         """
         self.output_dir = Path(output_dir)
+        self.all_data_file = self.output_dir / ("all_tenders.jsonl.gz" if compress else "all_tenders.jsonl")
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'PCC-Data-Downloader/1.0'
+            'User-Agent': 'PCC-Data-Downloader/1.0',
+            'Connection': 'keep-alive'
         })
+        # 所有請求都打向同一主機，放大連線池讓多執行緒共用長連線，
+        # 避免預設 10 條的池子滿載後丟棄連線、重新做 TLS 交握；
+        # pool_block 讓超出池子的請求等待既有連線，而非另開用完即丟的連線
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections, pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
     
-    def _request_with_retry(self, url, params=None, max_retries=3):
+    @retry_request()
+    def _get(self, url, params=None):
+        # 重試的請求同樣計入限速
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return self.session.get(url, params=params, timeout=30)
+    
+    def _request_with_retry(self, url, params=None):
         """帶重試機制的請求"""
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(url, params=params, timeout=30)
-                
-                # 處理 429 Too Many Requests
-                if response.status_code == 429:
-                    wait_time = 10 * (attempt + 1)
-                    print(f"      請求過快，等待 {wait_time} 秒後重試...")
-                    time.sleep(wait_time)
-                    continue
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except requests.exceptions.Timeout:
-                if attempt < max_retries - 1:
-                    time.sleep(5)
-                    continue
-                raise
-        
-        return None
+        response = self._get(url, params)
+        response.raise_for_status()
+        return response.json()
     
     def get_info(self):
         """取得 API 資訊（最新/最舊資料日期、總公告數等）"""
@@ -66,6 +202,9 @@ class PCCDownloader:
         """
         取得特定日期的所有標案列表
         
+        API 只提供以單日查詢的 listbydate（無日期區間或整月的彙總端點），
+        因此全量下載仍是每天一次請求，由 download_all_data 以多執行緒並行
+        
         Args:
             date_str: 日期字串，格式 YYYYMMDD
         
@@ -190,8 +329,7 @@ class PCCDownloader:
         
         # 儲存結果
         output_file = self.output_dir / f"tenders_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_data, f, ensure_ascii=False, indent=2)
+        output_file.write_bytes(orjson.dumps(all_data, option=orjson.OPT_INDENT_2))
         
         print(f"\n完成！共下載 {len(all_data)} 筆資料")
         print(f"已儲存至: {output_file}")
@@ -232,8 +370,7 @@ class PCCDownloader:
         # 儲存結果
         safe_keyword = keyword.replace('/', '_').replace('\\', '_')
         output_file = self.output_dir / f"search_{safe_keyword}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_data, f, ensure_ascii=False, indent=2)
+        output_file.write_bytes(orjson.dumps(all_data, option=orjson.OPT_INDENT_2))
         
         print(f"\n完成！共找到 {len(all_data)} 筆資料")
         print(f"已儲存至: {output_file}")
@@ -272,14 +409,36 @@ class PCCDownloader:
         print(f"已匯出 CSV: {output_file}")
 
 
-    def download_all_data(self, delay=0.5, save_interval=100):
+    def _fetch_date(self, date_str):
+        """
+        下載單日標案（於工作執行緒中執行）
+
+        Returns:
+            (date_str, 標案列表, 例外) — 例外交由主執行緒處理
+        """
+        try:
+            return date_str, self.list_by_date(date_str), None
+        except requests.exceptions.RequestException as e:
+            time.sleep(5)  # 網路錯誤時等待久一點
+            return date_str, None, e
+        except Exception as e:
+            return date_str, None, e
+
+    def download_all_data(self, delay=None, save_interval=100, max_workers=8):
         """
         下載全部歷史資料（支援斷點續傳）
         
+        請求速率由建構時的 rate_limit 控制，所有執行緒共用
+        
         Args:
-            delay: 每次請求間的延遲秒數
+            delay: 已停用，傳入的值會被忽略（改用 rate_limit）；保留此位置以相容舊的位置參數呼叫
             save_interval: 每下載多少天儲存一次進度
+            max_workers: 同時下載的執行緒數
         """
+        if delay is not None:
+            warnings.warn("download_all_data 的 delay 參數已停用，請改用 PCCDownloader(rate_limit=...)",
+                          DeprecationWarning, stacklevel=2)
+        
         # 取得 API 資訊
         print("正在取得 API 資訊...")
         info = self.get_info()
@@ -314,194 +473,235 @@ class PCCDownloader:
             oldest_date = datetime(1999, 1, 21)
             newest_date = datetime.now()
         
-        # 檢查進度檔案（斷點續傳）
+        # 檢查進度檔案（斷點續傳）：已完成日期逐行追加於 .log，統計資訊存於 .json
         progress_file = self.output_dir / "download_progress.json"
-        downloaded_dates = set()
-        all_data_file = self.output_dir / "all_tenders.jsonl"
+        progress_log_file = self.output_dir / "download_progress.log"
+        all_data_file = self.all_data_file
         
-        if progress_file.exists():
-            with open(progress_file, 'r', encoding='utf-8') as f:
-                progress = json.load(f)
-                downloaded_dates = set(progress.get('downloaded_dates', []))
-                print(f"發現進度檔案，已下載 {len(downloaded_dates)} 天的資料，繼續下載...")
+        downloaded_dates, new_dates = load_progress_log(progress_log_file, progress_file)
+        if downloaded_dates:
+            print(f"發現進度檔案，已下載 {len(downloaded_dates)} 天的資料，繼續下載...")
         
-        # 產生日期範圍
+        # 產生日期範圍，跳過已下載的日期
         start_date = oldest_date
         end_date = newest_date
         
         total_days = (end_date - start_date).days + 1
-        current_date = start_date
+        pending_dates = []
+        for offset in range(total_days):
+            date_str = (start_date + timedelta(days=offset)).strftime("%Y%m%d")
+            if date_str not in downloaded_dates:
+                pending_dates.append(date_str)
+        # 已下載日期只用於產生待下載清單，之後不再保留整個集合
+        previously_downloaded = len(downloaded_dates)
+        del downloaded_dates
         
         downloaded_count = 0
         total_tenders = 0
-        days_processed = 0
+        days_processed = total_days - len(pending_dates)
         
-        print(f"\n開始下載，共 {total_days} 天的資料...")
+        print(f"\n開始下載，共 {total_days} 天的資料（{max_workers} 個執行緒）...")
         print("=" * 60)
         
-        # 使用 append 模式寫入 JSONL
-        with open(all_data_file, 'a', encoding='utf-8') as data_file:
-            while current_date <= end_date:
-                date_str = current_date.strftime("%Y%m%d")
-                
-                # 跳過已下載的日期
-                if date_str in downloaded_dates:
-                    current_date += timedelta(days=1)
+        # 使用 append 模式寫入 JSONL；僅由主執行緒寫檔，依日期順序輸出。
+        # 1 MiB 寫入緩衝（或 gzip 壓縮），只在儲存進度時 flush
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        with open_jsonl(all_data_file, 'ab') as data_file, \
+             open(progress_log_file, 'a', encoding='utf-8') as progress_log:
+            try:
+                results = executor.map(self._fetch_date, pending_dates)
+                for date_str, data, error in results:
                     days_processed += 1
-                    continue
-                
-                # 計算進度
-                progress_pct = (days_processed / total_days) * 100
-                
-                try:
-                    data = self.list_by_date(date_str)
+                    
+                    # 計算進度
+                    progress_pct = (days_processed / total_days) * 100
+                    
+                    if isinstance(error, requests.exceptions.RequestException):
+                        print(f"[{progress_pct:5.1f}%] {date_str}: 網路錯誤 - {error}")
+                        continue
+                    if error is not None:
+                        print(f"[{progress_pct:5.1f}%] {date_str}: 錯誤 - {error}")
+                        continue
+                    
                     count = len(data) if data else 0
                     
-                    # 寫入資料（JSONL 格式，每行一筆）
+                    # 寫入資料（JSONL 格式，每行一筆；每天合併為一次寫入）
                     if data:
                         for item in data:
                             item['_download_date'] = date_str
-                            data_file.write(json.dumps(item, ensure_ascii=False) + '\n')
+                        data_file.write(b''.join(orjson.dumps(item) + b'\n' for item in data))
                         total_tenders += count
                     
-                    downloaded_dates.add(date_str)
+                    new_dates.append(date_str)
                     downloaded_count += 1
                     
                     print(f"[{progress_pct:5.1f}%] {date_str}: {count:4} 筆 | 累計: {total_tenders:,} 筆")
                     
-                except requests.exceptions.RequestException as e:
-                    print(f"[{progress_pct:5.1f}%] {date_str}: 網路錯誤 - {e}")
-                    time.sleep(5)  # 網路錯誤時等待久一點
-                    current_date += timedelta(days=1)
-                    days_processed += 1
-                    continue
-                except Exception as e:
-                    print(f"[{progress_pct:5.1f}%] {date_str}: 錯誤 - {e}")
-                
-                # 定期儲存進度
-                if downloaded_count % save_interval == 0:
-                    self._save_progress(progress_file, downloaded_dates, total_tenders)
-                    data_file.flush()
-                
-                current_date += timedelta(days=1)
-                days_processed += 1
-                time.sleep(delay)
-        
-        # 最終儲存進度
-        self._save_progress(progress_file, downloaded_dates, total_tenders)
+                    # 定期儲存進度（先寫出資料，進度才不會超前於資料檔）
+                    if downloaded_count % save_interval == 0:
+                        data_file.flush()
+                        self._save_progress(progress_file, progress_log, new_dates, total_tenders)
+            finally:
+                # 中斷時不再等待排隊中的日期，只讓進行中的請求結束
+                executor.shutdown(wait=False, cancel_futures=True)
+                # 最終儲存進度（先寫出資料，進度才不會超前於資料檔）
+                data_file.flush()
+                self._save_progress(progress_file, progress_log, new_dates, total_tenders)
         
         print("\n" + "=" * 60)
         print(f"下載完成！")
-        print(f"  - 總共下載: {len(downloaded_dates)} 天")
+        print(f"  - 總共下載: {previously_downloaded + downloaded_count} 天")
         print(f"  - 總標案數: {total_tenders:,} 筆")
         print(f"  - 資料檔案: {all_data_file}")
-        print(f"  - 進度檔案: {progress_file}")
+        print(f"  - 進度檔案: {progress_log_file}")
         
         return total_tenders
     
-    def _save_progress(self, progress_file, downloaded_dates, total_tenders):
-        """儲存下載進度"""
+    def _save_progress(self, progress_file, progress_log, new_dates, total_tenders):
+        """
+        儲存下載進度
+        
+        新完成的日期追加到進度紀錄檔後清空 new_dates；
+        progress_file 只保存統計資訊，大小不隨已下載天數成長
+        """
+        if new_dates:
+            progress_log.write(''.join(f"{date_str}\n" for date_str in new_dates))
+            progress_log.flush()
+            new_dates.clear()
+        
         progress = {
-            'downloaded_dates': list(downloaded_dates),
             'total_tenders': total_tenders,
             'last_update': datetime.now().isoformat()
         }
-        with open(progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress, f, ensure_ascii=False, indent=2)
+        progress_file.write_bytes(orjson.dumps(progress, option=orjson.OPT_INDENT_2))
     
-    def download_tender_details(self, delay=0.5, batch_size=1000):
+    def _fetch_detail(self, tender):
+        """
+        下載單筆標案詳細資料（於工作執行緒中執行）
+
+        Args:
+            tender: (tender_id, unit_id, job_number)
+
+        Returns:
+            (tender_id, 詳細資料, 例外) — 例外交由主執行緒處理
+        """
+        tender_id, unit_id, job_number = tender
+        try:
+            return tender_id, self.get_tender_detail(unit_id, job_number), None
+        except Exception as e:
+            return tender_id, None, e
+
+    def _save_details_progress(self, progress_file, progress_log, new_ids):
+        """
+        儲存詳細資料下載進度
+        
+        新完成的標案 ID 追加到進度紀錄檔後清空 new_ids；
+        progress_file 只保存更新時間，不再每次重寫整個 ID 列表
+        """
+        if new_ids:
+            progress_log.write(''.join(f"{tender_id}\n" for tender_id in new_ids))
+            progress_log.flush()
+            new_ids.clear()
+        progress_file.write_bytes(orjson.dumps({
+            'last_update': datetime.now().isoformat()
+        }))
+    
+    def download_tender_details(self, delay=None, batch_size=1000, max_workers=16):
         """
         下載所有標案的詳細資料
         需要先執行 download_all_data() 取得標案列表
         
+        請求速率由建構時的 rate_limit 控制，所有執行緒共用
+        
         Args:
-            delay: 每次請求間的延遲秒數
+            delay: 已停用，傳入的值會被忽略（改用 rate_limit）；保留此位置以相容舊的位置參數呼叫
             batch_size: 每批次儲存的數量
+            max_workers: 同時下載的執行緒數
         """
-        all_data_file = self.output_dir / "all_tenders.jsonl"
+        if delay is not None:
+            warnings.warn("download_tender_details 的 delay 參數已停用，請改用 PCCDownloader(rate_limit=...)",
+                          DeprecationWarning, stacklevel=2)
+        all_data_file = self.all_data_file
         details_file = self.output_dir / "tender_details.jsonl"
         progress_file = self.output_dir / "details_progress.json"
+        progress_log_file = self.output_dir / "details_progress.log"
         
         if not all_data_file.exists():
             print("請先執行 download_all_data() 下載標案列表")
             return
         
-        # 讀取已下載的詳細資料 ID
-        downloaded_ids = set()
-        if progress_file.exists():
-            with open(progress_file, 'r', encoding='utf-8') as f:
-                progress = json.load(f)
-                downloaded_ids = set(progress.get('downloaded_ids', []))
-                print(f"發現進度檔案，已下載 {len(downloaded_ids)} 筆詳細資料")
-        
-        # 讀取所有標案
-        print("正在讀取標案列表...")
-        tenders = []
-        with open(all_data_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    tender = json.loads(line.strip())
-                    tender_id = f"{tender.get('unit_id', '')}_{tender.get('job_number', '')}"
-                    if tender_id not in downloaded_ids and tender.get('unit_id') and tender.get('job_number'):
-                        tenders.append(tender)
-                except:
-                    continue
-        
-        print(f"需要下載 {len(tenders)} 筆詳細資料")
-        
-        # 下載詳細資料
+        # 讀取已下載的詳細資料 ID（逐行追加於 .log，舊版存於 .json 的 downloaded_ids）
+        downloaded_ids, new_ids = load_progress_log(progress_log_file, progress_file, 'downloaded_ids')
+        if downloaded_ids:
+            print(f"發現進度檔案，已下載 {len(downloaded_ids)} 筆詳細資料")
+        
+        # 逐行讀取標案列表，不把整個檔案載入記憶體
+        def iter_tenders():
+            with open_jsonl(all_data_file) as f:
+                for line in f:
+                    try:
+                        tender = orjson.loads(line)
+                        unit_id = tender.get('unit_id')
+                        job_number = tender.get('job_number')
+                    except:
+                        continue
+                    if not unit_id or not job_number:
+                        continue
+                    tender_id = f"{unit_id}_{job_number}"
+                    if tender_id not in downloaded_ids:
+                        yield tender_id, unit_id, job_number
+        
+        print(f"開始下載詳細資料（{max_workers} 個執行緒）...")
+        
+        # 下載詳細資料：多執行緒請求，由主執行緒寫檔與記錄進度；
+        # 同時排隊的標案最多 max_workers * 2 筆
         count = 0
-        with open(details_file, 'a', encoding='utf-8') as f:
-            for tender in tenders:
-                unit_id = tender.get('unit_id', '')
-                job_number = tender.get('job_number', '')
-                tender_id = f"{unit_id}_{job_number}"
-                
-                try:
-                    detail = self.get_tender_detail(unit_id, job_number)
-                    if detail:
-                        f.write(json.dumps(detail, ensure_ascii=False) + '\n')
-                        downloaded_ids.add(tender_id)
-                        count += 1
-                        
-                        if count % 100 == 0:
-                            progress_pct = (count / len(tenders)) * 100
-                            print(f"[{progress_pct:5.1f}%] 已下載 {count:,} 筆詳細資料")
-                        
-                        if count % batch_size == 0:
-                            # 儲存進度
-                            with open(progress_file, 'w', encoding='utf-8') as pf:
-                                json.dump({
-                                    'downloaded_ids': list(downloaded_ids),
-                                    'last_update': datetime.now().isoformat()
-                                }, pf, ensure_ascii=False)
-                            f.flush()
-                
-                except Exception as e:
-                    print(f"下載 {tender_id} 失敗: {e}")
-                
-                time.sleep(delay)
-        
-        # 最終儲存進度
-        with open(progress_file, 'w', encoding='utf-8') as pf:
-            json.dump({
-                'downloaded_ids': list(downloaded_ids),
-                'last_update': datetime.now().isoformat()
-            }, pf, ensure_ascii=False)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        with open(details_file, 'ab', buffering=1 << 20) as f, \
+             open(progress_log_file, 'a', encoding='utf-8') as progress_log:
+            try:
+                results = bounded_map(executor, self._fetch_detail, iter_tenders(), max_workers * 2)
+                for tender_id, detail, error in results:
+                    if error is not None:
+                        print(f"下載 {tender_id} 失敗: {error}")
+                        continue
+                    if not detail:
+                        continue
+                    
+                    f.write(orjson.dumps(detail) + b'\n')
+                    downloaded_ids.add(tender_id)
+                    new_ids.append(tender_id)
+                    count += 1
+                    
+                    if count % 100 == 0:
+                        print(f"已下載 {count:,} 筆詳細資料")
+                    
+                    if count % batch_size == 0:
+                        # 先寫出資料再儲存進度
+                        f.flush()
+                        self._save_details_progress(progress_file, progress_log, new_ids)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+                # 最終儲存進度（先寫出資料，進度才不會超前於資料檔）
+                f.flush()
+                self._save_details_progress(progress_file, progress_log, new_ids)
         
         print(f"\n完成！共下載 {count} 筆詳細資料")
         print(f"資料檔案: {details_file}")
     
-    def convert_jsonl_to_csv(self, input_file="all_tenders.jsonl", output_file="all_tenders.csv"):
+    def convert_jsonl_to_csv(self, input_file=None, output_file="all_tenders.csv"):
         """
         將 JSONL 檔案轉換為 CSV
         
         Args:
-            input_file: 輸入的 JSONL 檔名
+            input_file: 輸入的 JSONL 檔名（.gz 結尾視為 gzip 壓縮），預設為標案列表檔
             output_file: 輸出的 CSV 檔名
         """
         import csv
+        import tempfile
         
+        if input_file is None:
+            input_file = self.all_data_file.name
         input_path = self.output_dir / input_file
         output_path = self.output_dir / output_file
         
@@ -511,40 +711,49 @@ class PCCDownloader:
         
         print(f"正在轉換 {input_file} 為 CSV...")
         
-        # 第一遍：收集所有欄位
-        all_keys = set()
+        # 單遍讀取：資料列依欄位首次出現的順序暫存為值列表，
+        # 較早的列若缺少之後才出現的欄位，會以較短的列表示（即空值）
+        fieldnames = []
+        known_keys = set()
         count = 0
-        with open(input_path, 'r', encoding='utf-8') as f:
-            for line in f:
+        with open_jsonl(input_path) as infile, \
+             tempfile.TemporaryFile('w+', encoding='utf-8', newline='', dir=self.output_dir) as body:
+            writer = csv.writer(body)
+            for line in infile:
                 try:
-                    item = json.loads(line.strip())
-                    all_keys.update(item.keys())
+                    item = orjson.loads(line)
+                    keys = item.keys()
+                    if not known_keys.issuperset(keys):
+                        for key in keys:
+                            if key not in known_keys:
+                                known_keys.add(key)
+                                fieldnames.append(key)
+                    writer.writerow([item.get(key) for key in fieldnames])
                     count += 1
                 except:
                     continue
-        
-        print(f"  共 {count:,} 筆資料，{len(all_keys)} 個欄位")
-        
-        # 第二遍：寫入 CSV
-        with open(input_path, 'r', encoding='utf-8') as infile, \
-             open(output_path, 'w', encoding='utf-8-sig', newline='') as outfile:
             
-            writer = csv.DictWriter(outfile, fieldnames=sorted(all_keys))
-            writer.writeheader()
+            print(f"  共 {count:,} 筆資料，{len(fieldnames)} 個欄位")
             
-            for line in infile:
-                try:
-                    item = json.loads(line.strip())
-                    writer.writerow(item)
-                except:
-                    continue
+            # 輸出時依排序後的欄位重排暫存列，並補齊缺少的欄位，
+            # 與逐列以 DictWriter 寫入全部欄位的格式一致
+            header = sorted(fieldnames)
+            positions = [fieldnames.index(key) for key in header]
+            body.seek(0)
+            with open(output_path, 'w', encoding='utf-8-sig', newline='') as outfile:
+                out = csv.writer(outfile)
+                out.writerow(header)
+                for row in csv.reader(body):
+                    width = len(row)
+                    out.writerow([row[i] if i < width else '' for i in positions])
         
         print(f"  已儲存至: {output_path}")
     
     def get_statistics(self):
         """取得下載統計資訊"""
         progress_file = self.output_dir / "download_progress.json"
-        all_data_file = self.output_dir / "all_tenders.jsonl"
+        progress_log_file = self.output_dir / "download_progress.log"
+        all_data_file = self.all_data_file
         
         stats = {
             'downloaded_days': 0,
@@ -553,12 +762,13 @@ class PCCDownloader:
             'last_update': None
         }
         
+        downloaded_dates, _ = load_progress_log(progress_log_file, progress_file)
+        stats['downloaded_days'] = len(downloaded_dates)
+        
         if progress_file.exists():
-            with open(progress_file, 'r', encoding='utf-8') as f:
-                progress = json.load(f)
-                stats['downloaded_days'] = len(progress.get('downloaded_dates', []))
-                stats['total_tenders'] = progress.get('total_tenders', 0)
-                stats['last_update'] = progress.get('last_update')
+            progress = orjson.loads(progress_file.read_bytes())
+            stats['total_tenders'] = progress.get('total_tenders', 0)
+            stats['last_update'] = progress.get('last_update')
         
         if all_data_file.exists():
             stats['file_size_mb'] = all_data_file.stat().st_size / (1024 * 1024)
@@ -574,12 +784,16 @@ def main():
     parser.add_argument('--mode', choices=['all', 'details', 'recent', 'info', 'convert'],
                         default='all', help='執行模式')
     parser.add_argument('--days', type=int, default=7, help='recent 模式下載的天數')
-    parser.add_argument('--delay', type=float, default=0.3, help='請求間隔秒數')
+    parser.add_argument('--delay', type=float, default=0.3, help='recent 模式的請求間隔秒數')
+    parser.add_argument('--rate', type=float, default=10, help='所有執行緒合計每秒最多請求數（0 表示不限速）')
+    parser.add_argument('--workers', type=int, default=8, help='all/details 模式同時下載的執行緒數')
     parser.add_argument('--output', default='pcc_data', help='輸出目錄')
+    parser.add_argument('--compress', action='store_true',
+                        help='標案列表以 gzip 壓縮讀寫（all_tenders.jsonl.gz），各模式須一致使用')
     
     args = parser.parse_args()
     
-    downloader = PCCDownloader(output_dir=args.output)
+    downloader = PCCDownloader(output_dir=args.output, compress=args.compress, rate_limit=args.rate)
     
     if args.mode == 'info':
         # 顯示 API 資訊和下載統計
@@ -605,7 +819,7 @@ def main():
         print("提示: 可隨時按 Ctrl+C 中斷，下次執行會從中斷處繼續")
         print("=" * 60)
         try:
-            downloader.download_all_data(delay=args.delay)
+            downloader.download_all_data(max_workers=args.workers)
         except KeyboardInterrupt:
             print("\n\n使用者中斷，進度已儲存")
     
@@ -615,7 +829,7 @@ def main():
         print("開始下載標案詳細資料...")
         print("=" * 60)
         try:
-            downloader.download_tender_details(delay=args.delay)
+            downloader.download_tender_details(max_workers=args.workers)
         except KeyboardInterrupt:
             print("\n\n使用者中斷，進度已儲存")
     
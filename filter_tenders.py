@@ -7,8 +7,11 @@
 - 服務項目：廣告行銷、軟體開發、網站設計、AI部署、視覺設計
 """
 
-import json
+import orjson
 import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -39,32 +42,193 @@ EXCLUDE_KEYWORDS = ['工程', '營造', '建築', '土木', '機電', '水電',
                     '印刷', '油墨', '紙張']
 
 # 可投標的公告類型
-BID_TYPES = [
+BID_TYPES = frozenset({
     '公開招標公告',
     '公開取得報價單或企劃書公告',
     '經公開評選或公開徵求之限制性招標公告',
     '選擇性招標(個案)公告'
-]
+})
 
+# 缺少 brief 時的預設值（只讀，不會被修改）
+_EMPTY = {}
 
-def match_keywords(title, category):
-    """檢查標題是否符合某個類別的關鍵字"""
-    for kw in KEYWORDS.get(category, []):
-        if kw.lower() in title.lower():
-            return kw
-    return None
+# 輸入檔小於此大小時不啟動多行程，直接單行程篩選
+PARALLEL_FILTER_MIN_SIZE = 64 << 20
+
+# 報告中每個類別列出的標案數，以及終端機預覽的標案數
+REPORT_ITEMS_PER_CATEGORY = 50
+PREVIEW_ITEMS = 15
+
+# 公告類型的 UTF-8 位元組，用於解析 JSON 前先略過不可能符合的行；
+# 含 \u 跳脫的行無法從位元組判斷，也視為可能符合
+BID_TYPE_BYTES = [t.encode('utf-8') for t in BID_TYPES]
+BID_TYPE_PROBE_RE = re.compile(b'|'.join(map(re.escape, BID_TYPE_BYTES + [b'\\u'])))
+
+
+# 所有關鍵字（不分大小寫，統一轉小寫）合併成正規表示式，一次掃描標題：
+# KEYWORD_RE 快速判斷是否有任何關鍵字；KEYWORD_SCAN_RE 以前瞻在每個位置比對、
+# 長的優先，重疊的關鍵字也找得到。同一位置較短的關鍵字必為比對結果的前綴，
+# 由 _KEYWORD_PREFIXES 補回
+_LOWER_KEYWORDS = sorted({kw.lower() for kws in KEYWORDS.values() for kw in kws}, key=len, reverse=True)
+KEYWORD_RE = re.compile('|'.join(map(re.escape, _LOWER_KEYWORDS)))
+KEYWORD_SCAN_RE = re.compile('(?=(' + KEYWORD_RE.pattern + '))')
+_KEYWORD_PREFIXES = {kw: [p for p in _LOWER_KEYWORDS if kw.startswith(p)] for kw in _LOWER_KEYWORDS}
+
+
+def _keyword_entries():
+    """小寫關鍵字 -> [(類別, 在該類別列表中的順序, 原始關鍵字)]"""
+    entries = {}
+    for category, kws in KEYWORDS.items():
+        for index, kw in enumerate(kws):
+            entries.setdefault(kw.lower(), []).append((category, index, kw))
+    return entries
+
+
+_KEYWORD_ENTRIES = _keyword_entries()
+
+EXCLUDE_RE = re.compile('|'.join(map(re.escape, EXCLUDE_KEYWORDS)))
+
+
+def match_keywords(title):
+    """
+    檢查標題符合哪些類別的關鍵字
+    
+    Returns:
+        [(類別, 關鍵字)]，依 KEYWORDS 的類別順序；每個類別取列表中最前面的符合關鍵字
+    """
+    title_lower = title.lower()
+    first = KEYWORD_RE.search(title_lower)
+    if not first:
+        return []
+    
+    found = set()
+    for m in KEYWORD_SCAN_RE.finditer(title_lower, first.start()):
+        found.update(_KEYWORD_PREFIXES[m.group(1)])
+    
+    best = {}
+    for kw in found:
+        for category, index, original in _KEYWORD_ENTRIES[kw]:
+            if category not in best or index < best[category][0]:
+                best[category] = (index, original)
+    return [(category, best[category][1]) for category in KEYWORDS if category in best]
 
 
 def should_exclude(title):
     """檢查是否應該排除"""
-    for kw in EXCLUDE_KEYWORDS:
-        if kw in title:
-            return True
-    return False
+    return EXCLUDE_RE.search(title) is not None
+
+
+def _filter_range(args):
+    """
+    篩選輸入檔 [start, end) 位元組範圍內的標案並寫入輸出檔（可於子行程中執行）
+    
+    符合的標案邊讀邊寫入檔案，記憶體中只保留統計與報告需要的前幾筆
+    
+    Args:
+        args: (input_file, start, end, all_path, cat_paths)，start/end 須對齊行首，
+              cat_paths 為 {類別: 輸出路徑}
+    
+    Returns:
+        (各類別筆數, 各類別前幾筆, 全部結果前幾筆, 總筆數)
+    """
+    input_file, start, end, all_path, cat_paths = args
+    
+    counts = dict.fromkeys(KEYWORDS, 0)
+    previews = {cat: [] for cat in KEYWORDS}
+    all_preview = []
+    total = 0
+    
+    cat_files = {}  # 類別檔在該類別第一次有結果時才建立
+    
+    # 每行都會用到的全域函式先綁定為區域變數
+    loads = orjson.loads
+    dumps = orjson.dumps
+    probe = BID_TYPE_PROBE_RE.search
+    exclude = EXCLUDE_RE.search
+    bid_types = BID_TYPES
+    
+    with open(input_file, 'rb') as f, open(all_path, 'wb') as all_fp:
+        try:
+            f.seek(start)
+            remaining = end - start
+            for line in f:
+                if remaining <= 0:
+                    break
+                remaining -= len(line)
+                
+                # 行中沒有任何可投標的公告類型就不必解析
+                if not probe(line):
+                    continue
+                
+                try:
+                    data = loads(line)
+                    brief = data.get('brief') or _EMPTY
+                    tender_type = brief.get('type', '')
+                    
+                    # 只看可投標的公告
+                    if tender_type not in bid_types:
+                        continue
+                    
+                    title = brief.get('title', '')
+                    if not title:
+                        continue
+                    
+                    # 排除不相關的案子
+                    if exclude(title):
+                        continue
+                    
+                    # 檢查是否符合任一類別
+                    matched_categories = match_keywords(title)
+                    
+                    if matched_categories:
+                        tender_info = {
+                            'date': data.get('date'),
+                            'title': title,
+                            'type': tender_type,
+                            'unit_name': data.get('unit_name', '未知機關'),
+                            'job_number': data.get('job_number'),
+                            'url': f"https://web.pcc.gov.tw{data.get('url', '')}",
+                            'api_url': data.get('tender_api_url', ''),
+                            'matched_categories': [c[0] for c in matched_categories],
+                            'matched_keywords': [c[1] for c in matched_categories]
+                        }
+                        
+                        # 只編碼一次，同一份位元組寫入全部結果與各類別檔
+                        blob = dumps(tender_info) + b'\n'
+                        all_fp.write(blob)
+                        total += 1
+                        if len(all_preview) < PREVIEW_ITEMS:
+                            all_preview.append(tender_info)
+                        
+                        # 依類別分類儲存
+                        for category, _ in matched_categories:
+                            cat_fp = cat_files.get(category)
+                            if cat_fp is None:
+                                cat_fp = cat_files[category] = open(cat_paths[category], 'wb')
+                            cat_fp.write(blob)
+                            counts[category] += 1
+                            if len(previews[category]) < REPORT_ITEMS_PER_CATEGORY:
+                                previews[category].append(tender_info)
+                            
+                except Exception as e:
+                    pass
+        finally:
+            for cat_fp in cat_files.values():
+                cat_fp.close()
+    
+    return counts, previews, all_preview, total
 
 
-def filter_tenders():
-    """篩選適合的標案"""
+def filter_tenders(workers=None):
+    """
+    篩選適合的標案
+    
+    大檔案依位元組範圍（對齊換行）切成 workers 段，由多個行程各自篩選成
+    分段檔，最後依序串接，輸出順序與單行程相同。
+    
+    Args:
+        workers: 行程數，預設為 CPU 核心數
+    """
     
     print("=" * 70)
     print("篩選適合公司的政府標案")
@@ -76,131 +240,137 @@ def filter_tenders():
     # 建立輸出目錄
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     
-    # 儲存結果
-    results = {cat: [] for cat in KEYWORDS.keys()}
-    all_matches = []
+    all_path = OUTPUT_DIR / "all_matched.jsonl"
+    cat_paths = {cat: OUTPUT_DIR / f"{cat.replace('/', '_')}.jsonl" for cat in KEYWORDS}
+    size = os.path.getsize(INPUT_FILE)
+    workers = workers or os.cpu_count() or 1
     
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                data = json.loads(line)
-                tender_type = data.get('brief', {}).get('type', '')
-                
-                # 只看可投標的公告
-                if tender_type not in BID_TYPES:
-                    continue
-                
-                title = data.get('brief', {}).get('title', '')
-                
-                # 排除不相關的案子
-                if should_exclude(title):
-                    continue
-                
-                # 檢查是否符合任一類別
-                matched_categories = []
-                for category in KEYWORDS.keys():
-                    kw = match_keywords(title, category)
-                    if kw:
-                        matched_categories.append((category, kw))
-                
-                if matched_categories:
-                    tender_info = {
-                        'date': data.get('date'),
-                        'title': title,
-                        'type': tender_type,
-                        'unit_name': data.get('unit_name', '未知機關'),
-                        'job_number': data.get('job_number'),
-                        'url': f"https://web.pcc.gov.tw{data.get('url', '')}",
-                        'api_url': data.get('tender_api_url', ''),
-                        'matched_categories': [c[0] for c in matched_categories],
-                        'matched_keywords': [c[1] for c in matched_categories],
-                        'raw_data': data
-                    }
-                    
-                    all_matches.append(tender_info)
-                    
-                    # 依類別分類儲存
-                    for category, _ in matched_categories:
-                        results[category].append(tender_info)
-                        
-            except Exception as e:
-                pass
+    if workers == 1 or size < PARALLEL_FILTER_MIN_SIZE:
+        counts, previews, all_preview, total = _filter_range((INPUT_FILE, 0, size, all_path, cat_paths))
+    else:
+        # 切點對齊到下一行的行首
+        offsets = [0]
+        with open(INPUT_FILE, 'rb') as f:
+            for i in range(1, workers):
+                f.seek(max(size * i // workers, offsets[-1]))
+                f.readline()
+                offsets.append(min(f.tell(), size))
+        offsets.append(size)
+        ranges = [(s, e) for s, e in zip(offsets, offsets[1:]) if s < e]
+        
+        part_paths = [
+            (all_path.with_suffix(f'.part{i}.jsonl'),
+             {cat: path.with_suffix(f'.part{i}.jsonl') for cat, path in cat_paths.items()})
+            for i in range(len(ranges))
+        ]
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            results = list(executor.map(
+                _filter_range,
+                [(INPUT_FILE, s, e, all_part, cat_parts)
+                 for (s, e), (all_part, cat_parts) in zip(ranges, part_paths)]
+            ))
+        
+        # 合併各段統計，報告只取最前面幾筆
+        counts = dict.fromkeys(KEYWORDS, 0)
+        previews = {cat: [] for cat in KEYWORDS}
+        all_preview = []
+        total = 0
+        for part_counts, part_previews, part_all_preview, part_total in results:
+            total += part_total
+            all_preview.extend(part_all_preview)
+            for cat in KEYWORDS:
+                counts[cat] += part_counts[cat]
+                previews[cat].extend(part_previews[cat])
+        del all_preview[PREVIEW_ITEMS:]
+        for items in previews.values():
+            del items[REPORT_ITEMS_PER_CATEGORY:]
+        
+        # 依分段順序串接；類別檔只在該類別有結果時建立
+        outputs = [(all_path, [all_part for all_part, _ in part_paths])]
+        outputs += [(path, [cat_parts[cat] for _, cat_parts in part_paths])
+                    for cat, path in cat_paths.items() if counts[cat]]
+        for path, parts in outputs:
+            with open(path, 'wb') as out:
+                for part in parts:
+                    if part.exists():
+                        with open(part, 'rb') as f:
+                            shutil.copyfileobj(f, out, 1 << 20)
+                        os.remove(part)
+        for _, cat_parts in part_paths:
+            for part in cat_parts.values():
+                if part.exists():
+                    os.remove(part)
     
     # 輸出結果
-    print(f"找到 {len(all_matches)} 筆適合的標案")
+    print(f"找到 {total} 筆適合的標案")
     print()
     
-    # 儲存全部結果
-    all_file = OUTPUT_DIR / "all_matched.jsonl"
-    with open(all_file, 'w', encoding='utf-8') as f:
-        for item in all_matches:
-            # 移除 raw_data 以減少檔案大小
-            output = {k: v for k, v in item.items() if k != 'raw_data'}
-            f.write(json.dumps(output, ensure_ascii=False) + '\n')
-    
-    # 依類別儲存
-    for category, items in results.items():
-        if items:
-            safe_name = category.replace('/', '_')
-            cat_file = OUTPUT_DIR / f"{safe_name}.jsonl"
-            with open(cat_file, 'w', encoding='utf-8') as f:
-                for item in items:
-                    output = {k: v for k, v in item.items() if k != 'raw_data'}
-                    f.write(json.dumps(output, ensure_ascii=False) + '\n')
-    
     # 產生摘要報告
-    generate_report(results, all_matches)
+    generate_report(counts, previews, all_preview, total)
     
-    return results
+    return counts
 
 
-def generate_report(results, all_matches):
-    """產生摘要報告"""
+def generate_report(counts, previews, all_preview, total):
+    """
+    產生摘要報告
+    
+    Args:
+        counts: 各類別的標案數
+        previews: 各類別前 REPORT_ITEMS_PER_CATEGORY 筆標案
+        all_preview: 全部結果的前 PREVIEW_ITEMS 筆標案
+        total: 符合條件的標案總數
+    """
     
     report_file = OUTPUT_DIR / "README.md"
     
-    with open(report_file, 'w', encoding='utf-8') as f:
-        f.write("# 適合公司的政府標案\n\n")
-        f.write(f"篩選時間: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        f.write("## 公司資訊\n\n")
-        f.write("- **資本額**: 200萬\n")
-        f.write("- **服務項目**: 廣告行銷、軟體開發、網站設計、AI部署、視覺設計\n\n")
-        
-        f.write("## 統計摘要\n\n")
-        f.write(f"共找到 **{len(all_matches)}** 筆可能適合的標案\n\n")
-        f.write("| 類別 | 筆數 |\n")
-        f.write("|------|------|\n")
-        for category, items in results.items():
-            f.write(f"| {category} | {len(items)} |\n")
-        f.write("\n")
-        
-        f.write("## 檔案說明\n\n")
-        f.write("| 檔案 | 說明 |\n")
-        f.write("|------|------|\n")
-        f.write("| `all_matched.jsonl` | 全部符合條件的標案 |\n")
-        for category in KEYWORDS.keys():
-            safe_name = category.replace('/', '_')
-            f.write(f"| `{safe_name}.jsonl` | {category}相關標案 |\n")
-        f.write("\n")
-        
-        f.write("## 標案列表\n\n")
-        
-        for category, items in results.items():
-            if items:
-                f.write(f"### {category} ({len(items)} 筆)\n\n")
-                for item in items[:50]:  # 每類最多顯示 50 筆
-                    f.write(f"#### {item['title']}\n\n")
-                    f.write(f"- **機關**: {item['unit_name']}\n")
-                    f.write(f"- **日期**: {item['date']}\n")
-                    f.write(f"- **類型**: {item['type']}\n")
-                    f.write(f"- **標案編號**: {item['job_number']}\n")
-                    f.write(f"- **連結**: [查看詳情]({item['url']})\n")
-                    f.write(f"- **符合關鍵字**: {', '.join(item['matched_keywords'])}\n")
-                    f.write("\n")
-                
-                if len(items) > 50:
-                    f.write(f"*（僅顯示前 50 筆，完整資料請查看 JSONL 檔案）*\n\n")
+    # 先組成字串片段列表，最後一次寫出
+    parts = []
+    append = parts.append
+    
+    append("# 適合公司的政府標案\n\n")
+    append(f"篩選時間: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+    
+    append("## 公司資訊\n\n"
+           "- **資本額**: 200萬\n"
+           "- **服務項目**: 廣告行銷、軟體開發、網站設計、AI部署、視覺設計\n\n")
+    
+    append("## 統計摘要\n\n")
+    append(f"共找到 **{total}** 筆可能適合的標案\n\n")
+    append("| 類別 | 筆數 |\n"
+           "|------|------|\n")
+    for category, count in counts.items():
+        append(f"| {category} | {count} |\n")
+    append("\n")
+    
+    append("## 檔案說明\n\n"
+           "| 檔案 | 說明 |\n"
+           "|------|------|\n"
+           "| `all_matched.jsonl` | 全部符合條件的標案 |\n")
+    for category in KEYWORDS.keys():
+        safe_name = category.replace('/', '_')
+        append(f"| `{safe_name}.jsonl` | {category}相關標案 |\n")
+    append("\n")
+    
+    append("## 標案列表\n\n")
+    
+    for category, items in previews.items():
+        if items:
+            append(f"### {category} ({counts[category]} 筆)\n\n")
+            for item in items:
+                append(f"#### {item['title']}\n\n"
+                       f"- **機關**: {item['unit_name']}\n"
+                       f"- **日期**: {item['date']}\n"
+                       f"- **類型**: {item['type']}\n"
+                       f"- **標案編號**: {item['job_number']}\n"
+                       f"- **連結**: [查看詳情]({item['url']})\n"
+                       f"- **符合關鍵字**: {', '.join(item['matched_keywords'])}\n"
+                       "\n")
+            
+            if counts[category] > REPORT_ITEMS_PER_CATEGORY:
+                append(f"*（僅顯示前 {REPORT_ITEMS_PER_CATEGORY} 筆，完整資料請查看 JSONL 檔案）*\n\n")
+    
+    report_file.write_text(''.join(parts), encoding='utf-8')
     
     print(f"✓ 已產生報告: {report_file}")
     print()
@@ -209,8 +379,8 @@ def generate_report(results, all_matches):
     print("=" * 70)
     print("篩選結果摘要")
     print("=" * 70)
-    for category, items in results.items():
-        print(f"  {category}: {len(items)} 筆")
+    for category, count in counts.items():
+        print(f"  {category}: {count} 筆")
     print()
     print(f"輸出目錄: {OUTPUT_DIR}")
     print()
@@ -219,7 +389,7 @@ def generate_report(results, all_matches):
     print("=" * 70)
     print("部分標案預覽")
     print("=" * 70)
-    for item in all_matches[:15]:
+    for item in all_preview:
         print(f"\n【{item['type']}】{item['title']}")
         print(f"  機關: {item['unit_name']}")
         print(f"  日期: {item['date']}")
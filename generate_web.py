@@ -3,82 +3,76 @@
 產生標案瀏覽網頁（含書籤功能）
 """
 
-import json
+import gc
+import gzip
+import hashlib
+import itertools
+import orjson
+import os
+import shutil
+import textwrap
+from collections import Counter, defaultdict
 from pathlib import Path
 from datetime import datetime
 
 INPUT_FILE = "pcc_data/2026/filtered_for_company/all_matched.jsonl"
 OUTPUT_FILE = "pcc_data/2026/filtered_for_company/index.html"
+DATA_FILE = "pcc_data/2026/filtered_for_company/tenders.js"
+STYLE_FILE = "pcc_data/2026/filtered_for_company/styles.css"
 
-def load_tenders():
-    """載入標案資料"""
-    tenders = []
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            tenders.append(json.loads(line))
-    return tenders
+# 嵌入網頁的標案欄位（書籤與離線匯出的內容也以此為準），順序與 filter_tenders.py 輸出一致
+TENDER_FIELDS = (
+    'date', 'title', 'type', 'unit_name', 'job_number', 'url', 'api_url',
+    'matched_categories', 'matched_keywords',
+)
 
-def generate_html(tenders):
-    """產生 HTML"""
-    
-    # 統計各類別數量
-    category_counts = {}
-    for t in tenders:
-        for cat in t.get('matched_categories', []):
-            category_counts[cat] = category_counts.get(cat, 0) + 1
-    
-    html = f'''<!DOCTYPE html>
-<html lang="zh-TW">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>適合公司的政府標案 - 2026年</title>
-    <style>
-        * {{
+# 頁面樣式（一般字串常數，不經 f-string 格式化，大括號無須跳脫），輸出為 styles.css
+STYLE = '''
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 20px;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
-        }}
+        }
         
-        header {{
+        header {
             background: white;
             border-radius: 16px;
             padding: 30px;
             margin-bottom: 20px;
             box-shadow: 0 10px 40px rgba(0,0,0,0.1);
-        }}
+        }
         
-        h1 {{
+        h1 {
             color: #333;
             font-size: 28px;
             margin-bottom: 10px;
-        }}
+        }
         
-        .subtitle {{
+        .subtitle {
             color: #666;
             font-size: 14px;
-        }}
+        }
         
-        .stats {{
+        .stats {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(120px, 1fr));
             gap: 15px;
             margin-top: 20px;
-        }}
+        }
         
-        .stat-card {{
+        .stat-card {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 20px;
@@ -86,45 +80,45 @@ def generate_html(tenders):
             text-align: center;
             cursor: pointer;
             transition: transform 0.3s;
-        }}
+        }
         
-        .stat-card:hover {{
+        .stat-card:hover {
             transform: scale(1.05);
-        }}
+        }
         
-        .stat-card.alt {{
+        .stat-card.alt {
             background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-        }}
+        }
         
-        .stat-card.green {{
+        .stat-card.green {
             background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-        }}
+        }
         
-        .stat-card.orange {{
+        .stat-card.orange {
             background: linear-gradient(135deg, #fa709a 0%, #fee140 100%);
-        }}
+        }
         
-        .stat-card.blue {{
+        .stat-card.blue {
             background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%);
             color: #333;
-        }}
+        }
         
-        .stat-card.bookmark {{
+        .stat-card.bookmark {
             background: linear-gradient(135deg, #f5af19 0%, #f12711 100%);
-        }}
+        }
         
-        .stat-number {{
+        .stat-number {
             font-size: 32px;
             font-weight: bold;
-        }}
+        }
         
-        .stat-label {{
+        .stat-label {
             font-size: 13px;
             opacity: 0.9;
             margin-top: 5px;
-        }}
+        }
         
-        .filters {{
+        .filters {
             background: white;
             border-radius: 16px;
             padding: 20px 30px;
@@ -134,35 +128,35 @@ def generate_html(tenders):
             flex-wrap: wrap;
             gap: 15px;
             align-items: center;
-        }}
+        }
         
-        .search-box {{
+        .search-box {
             flex: 1;
             min-width: 250px;
-        }}
+        }
         
-        .search-box input {{
+        .search-box input {
             width: 100%;
             padding: 12px 20px;
             border: 2px solid #e0e0e0;
             border-radius: 30px;
             font-size: 16px;
             transition: all 0.3s;
-        }}
+        }
         
-        .search-box input:focus {{
+        .search-box input:focus {
             outline: none;
             border-color: #667eea;
             box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.2);
-        }}
+        }
         
-        .filter-group {{
+        .filter-group {
             display: flex;
             gap: 10px;
             flex-wrap: wrap;
-        }}
+        }
         
-        .filter-btn {{
+        .filter-btn {
             padding: 10px 20px;
             border: 2px solid #e0e0e0;
             border-radius: 30px;
@@ -170,124 +164,127 @@ def generate_html(tenders):
             cursor: pointer;
             font-size: 14px;
             transition: all 0.3s;
-        }}
+        }
         
-        .filter-btn:hover {{
+        .filter-btn:hover {
             border-color: #667eea;
             color: #667eea;
-        }}
+        }
         
-        .filter-btn.active {{
+        .filter-btn.active {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             border-color: transparent;
-        }}
+        }
         
-        .filter-btn.bookmark-filter {{
+        .filter-btn.bookmark-filter {
             background: linear-gradient(135deg, #f5af19 0%, #f12711 100%);
             color: white;
             border-color: transparent;
-        }}
+        }
         
-        .tender-list {{
+        .tender-list {
             display: grid;
             gap: 15px;
-        }}
+        }
         
-        .tender-card {{
+        .tender-card {
             background: white;
             border-radius: 16px;
             padding: 25px;
             box-shadow: 0 10px 40px rgba(0,0,0,0.1);
             transition: all 0.3s;
             position: relative;
-        }}
+            /* 畫面外的卡片略過排版與繪製，內容高度先以一般卡片（不含 padding）估計 */
+            content-visibility: auto;
+            contain-intrinsic-size: auto 146px;
+        }
         
-        .tender-card:hover {{
+        .tender-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 20px 60px rgba(0,0,0,0.15);
-        }}
+        }
         
-        .tender-card.bookmarked {{
+        .tender-card.bookmarked {
             border-left: 5px solid #f5af19;
-        }}
+        }
         
-        .tender-header {{
+        .tender-header {
             display: flex;
             justify-content: space-between;
             align-items: flex-start;
             margin-bottom: 15px;
-        }}
+        }
         
-        .tender-title {{
+        .tender-title {
             font-size: 18px;
             font-weight: 600;
             color: #333;
             line-height: 1.4;
             flex: 1;
             margin-right: 15px;
-        }}
+        }
         
-        .tender-date {{
+        .tender-date {
             background: #f0f0f0;
             padding: 5px 12px;
             border-radius: 20px;
             font-size: 13px;
             color: #666;
             white-space: nowrap;
-        }}
+        }
         
-        .tender-meta {{
+        .tender-meta {
             display: flex;
             flex-wrap: wrap;
             gap: 10px;
             margin-bottom: 15px;
-        }}
+        }
         
-        .meta-item {{
+        .meta-item {
             display: flex;
             align-items: center;
             gap: 5px;
             font-size: 14px;
             color: #666;
-        }}
+        }
         
-        .tender-tags {{
+        .tender-tags {
             display: flex;
             flex-wrap: wrap;
             gap: 8px;
             margin-bottom: 15px;
-        }}
+        }
         
-        .tag {{
+        .tag {
             padding: 5px 12px;
             border-radius: 20px;
             font-size: 12px;
             font-weight: 500;
-        }}
+        }
         
-        .tag-category {{
+        .tag-category {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
-        }}
+        }
         
-        .tag-keyword {{
+        .tag-keyword {
             background: #e8f4fd;
             color: #1976d2;
-        }}
+        }
         
-        .tag-type {{
+        .tag-type {
             background: #fff3e0;
             color: #e65100;
-        }}
+        }
         
-        .tender-actions {{
+        .tender-actions {
             display: flex;
             gap: 10px;
             flex-wrap: wrap;
-        }}
+        }
         
-        .btn {{
+        .btn {
             padding: 10px 20px;
             border-radius: 30px;
             font-size: 14px;
@@ -299,60 +296,60 @@ def generate_html(tenders):
             gap: 8px;
             border: none;
             cursor: pointer;
-        }}
+        }
         
-        .btn-primary {{
+        .btn-primary {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
-        }}
+        }
         
-        .btn-primary:hover {{
+        .btn-primary:hover {
             transform: scale(1.05);
             box-shadow: 0 5px 20px rgba(102, 126, 234, 0.4);
-        }}
+        }
         
-        .btn-secondary {{
+        .btn-secondary {
             background: #f5f5f5;
             color: #333;
-        }}
+        }
         
-        .btn-secondary:hover {{
+        .btn-secondary:hover {
             background: #e0e0e0;
-        }}
+        }
         
-        .btn-bookmark {{
+        .btn-bookmark {
             background: #fff3e0;
             color: #e65100;
-        }}
+        }
         
-        .btn-bookmark:hover {{
+        .btn-bookmark:hover {
             background: #ffe0b2;
-        }}
+        }
         
-        .btn-bookmark.active {{
+        .btn-bookmark.active {
             background: linear-gradient(135deg, #f5af19 0%, #f12711 100%);
             color: white;
-        }}
+        }
         
-        .btn-download {{
+        .btn-download {
             background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
             color: white;
-        }}
+        }
         
-        .no-results {{
+        .no-results {
             background: white;
             border-radius: 16px;
             padding: 60px;
             text-align: center;
             color: #666;
-        }}
+        }
         
-        .no-results-icon {{
+        .no-results-icon {
             font-size: 60px;
             margin-bottom: 20px;
-        }}
+        }
         
-        .tender-count {{
+        .tender-count {
             background: white;
             border-radius: 16px;
             padding: 15px 30px;
@@ -365,25 +362,25 @@ def generate_html(tenders):
             align-items: center;
             flex-wrap: wrap;
             gap: 10px;
-        }}
+        }
         
-        .tender-count strong {{
+        .tender-count strong {
             color: #667eea;
-        }}
+        }
         
-        .bookmark-note {{
+        .bookmark-note {
             margin-top: 15px;
             padding: 15px;
             background: #fff8e1;
             border-radius: 10px;
             display: none;
-        }}
+        }
         
-        .bookmark-note.show {{
+        .bookmark-note.show {
             display: block;
-        }}
+        }
         
-        .bookmark-note textarea {{
+        .bookmark-note textarea {
             width: 100%;
             padding: 10px;
             border: 1px solid #ddd;
@@ -391,23 +388,23 @@ def generate_html(tenders):
             resize: vertical;
             min-height: 60px;
             font-family: inherit;
-        }}
+        }
         
-        .bookmark-note-header {{
+        .bookmark-note-header {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-bottom: 10px;
-        }}
+        }
         
-        .priority-select {{
+        .priority-select {
             padding: 5px 10px;
             border-radius: 20px;
             border: 1px solid #ddd;
-        }}
+        }
         
         /* Toast 通知 */
-        .toast {{
+        .toast {
             position: fixed;
             bottom: 30px;
             right: 30px;
@@ -420,23 +417,23 @@ def generate_html(tenders):
             transform: translateY(100px);
             opacity: 0;
             transition: all 0.3s;
-        }}
+        }
         
-        .toast.show {{
+        .toast.show {
             transform: translateY(0);
             opacity: 1;
-        }}
+        }
         
-        .toast.success {{
+        .toast.success {
             background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
-        }}
+        }
         
-        .toast.error {{
+        .toast.error {
             background: linear-gradient(135deg, #f5576c 0%, #f093fb 100%);
-        }}
+        }
         
         /* 連線狀態 */
-        .connection-status {{
+        .connection-status {
             position: fixed;
             top: 20px;
             right: 20px;
@@ -447,225 +444,215 @@ def generate_html(tenders):
             display: flex;
             align-items: center;
             gap: 8px;
-        }}
+        }
         
-        .connection-status.connected {{
+        .connection-status.connected {
             background: #e8f5e9;
             color: #2e7d32;
-        }}
+        }
         
-        .connection-status.disconnected {{
+        .connection-status.disconnected {
             background: #ffebee;
             color: #c62828;
-        }}
+        }
         
-        .status-dot {{
+        .status-dot {
             width: 10px;
             height: 10px;
             border-radius: 50%;
-        }}
+        }
         
-        .connected .status-dot {{
+        .connected .status-dot {
             background: #4caf50;
-        }}
+        }
         
-        .disconnected .status-dot {{
+        .disconnected .status-dot {
             background: #f44336;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            .filters {{
+        @media (max-width: 768px) {
+            .filters {
                 flex-direction: column;
-            }}
+            }
             
-            .search-box {{
+            .search-box {
                 width: 100%;
-            }}
+            }
             
-            .tender-header {{
+            .tender-header {
                 flex-direction: column;
                 gap: 10px;
-            }}
+            }
             
-            .tender-date {{
+            .tender-date {
                 align-self: flex-start;
-            }}
+            }
             
-            .stats {{
+            .stats {
                 grid-template-columns: repeat(3, 1fr);
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="connection-status disconnected" id="connectionStatus">
-        <span class="status-dot"></span>
-        <span id="statusText">未連接伺服器</span>
-    </div>
-    
-    <div class="toast" id="toast"></div>
-    
-    <div class="container">
-        <header>
-            <h1>🎯 適合公司的政府標案</h1>
-            <p class="subtitle">篩選時間：{datetime.now().strftime('%Y-%m-%d %H:%M')} | 資料範圍：2026年1月</p>
-            
-            <div class="stats">
-                <div class="stat-card" onclick="setCategory('all', this)">
-                    <div class="stat-number">{len(tenders)}</div>
-                    <div class="stat-label">全部標案</div>
-                </div>
-                <div class="stat-card bookmark" onclick="showBookmarksOnly()">
-                    <div class="stat-number" id="bookmarkCount">0</div>
-                    <div class="stat-label">⭐ 書籤</div>
-                </div>
-                <div class="stat-card alt" onclick="setCategory('廣告行銷')">
-                    <div class="stat-number">{category_counts.get('廣告行銷', 0)}</div>
-                    <div class="stat-label">廣告行銷</div>
-                </div>
-                <div class="stat-card green" onclick="setCategory('軟體開發')">
-                    <div class="stat-number">{category_counts.get('軟體開發', 0)}</div>
-                    <div class="stat-label">軟體開發</div>
-                </div>
-                <div class="stat-card orange" onclick="setCategory('網站設計')">
-                    <div class="stat-number">{category_counts.get('網站設計', 0)}</div>
-                    <div class="stat-label">網站設計</div>
-                </div>
-                <div class="stat-card blue" onclick="setCategory('AI部署')">
-                    <div class="stat-number">{category_counts.get('AI部署', 0)}</div>
-                    <div class="stat-label">AI部署</div>
-                </div>
-            </div>
-        </header>
-        
-        <div class="filters">
-            <div class="search-box">
-                <input type="text" id="searchInput" placeholder="🔍 搜尋標案名稱、機關..." onkeyup="filterTenders()">
-            </div>
-            <div class="filter-group">
-                <button class="filter-btn active" id="filterAll" onclick="setCategory('all', this)">全部</button>
-                <button class="filter-btn" onclick="setCategory('廣告行銷', this)">廣告行銷</button>
-                <button class="filter-btn" onclick="setCategory('軟體開發', this)">軟體開發</button>
-                <button class="filter-btn" onclick="setCategory('網站設計', this)">網站設計</button>
-                <button class="filter-btn" onclick="setCategory('AI部署', this)">AI部署</button>
-                <button class="filter-btn" onclick="setCategory('視覺設計', this)">視覺設計</button>
-                <button class="filter-btn" id="filterBookmark" onclick="showBookmarksOnly()">⭐ 書籤</button>
-            </div>
-        </div>
-        
-        <div class="tender-count" id="tenderCount">
-            <span>顯示 <strong>{len(tenders)}</strong> 筆標案</span>
-            <div>
-                <button class="btn btn-download" onclick="downloadBookmarkedTenders()" id="downloadBtn" style="display:none;">
-                    📥 下載書籤標書
-                </button>
-                <button class="btn btn-secondary" onclick="exportBookmarks()" id="exportBtn" style="display:none;">
-                    📤 匯出書籤
-                </button>
-            </div>
-        </div>
-        
-        <div class="tender-list" id="tenderList">
-        </div>
-    </div>
-    
-    <script>
-        const API_BASE = 'http://localhost:8080/api';
-        const tenders = {json.dumps(tenders, ensure_ascii=False)};
+            }
+        }
+'''
+
+# 前端腳本（接在 tenders 資料之後）
+SCRIPT = '''
         
         let currentCategory = 'all';
         let searchText = '';
         let showOnlyBookmarks = false;
         let bookmarkedJobs = new Set();
-        let bookmarkNotes = {{}};
+        let bookmarkNotes = {};
         let isConnected = false;
         
+        // 還原資料檔中以字串表索引表示的欄位（書籤與匯出仍使用原本的字串）
+        tenders.forEach(t => {
+            if (typeof t.type === 'number') {
+                t.type = vocab[t.type];
+            }
+            if (t.matched_categories) {
+                t.matched_categories = t.matched_categories.map(i => vocab[i]);
+            }
+            if (t.matched_keywords) {
+                t.matched_keywords = t.matched_keywords.map(i => vocab[i]);
+            }
+        });
+        
+        // 可搜尋欄位（標題、機關、關鍵字）載入時轉小寫一次並以換行串接；
+        // 搜尋框無法輸入換行，因此比對不會跨欄位，結果與逐欄比對相同
+        const searchTexts = tenders.map(t =>
+            [t.title || '', t.unit_name || '', ...(t.matched_keywords || [])].join('\\n').toLowerCase()
+        );
+        
+        const escapeHtml = value => String(value).replace(/[&<>"']/g, c => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'
+        })[c]);
+        
+        // 單筆標案卡片的 HTML（欄位值皆已跳脫），書籤狀態另由 syncBookmark 切換
+        function renderCard(index, tender) {
+            const date = tender.date == null ? '' : String(tender.date);
+            // 連結只接受 http(s)，避免資料中的 javascript: 等網址被點擊執行
+            const url = /^https?:\\/\\//.test(tender.url || '') ? tender.url : '';
+            const tags = [`<span class="tag tag-type">${escapeHtml(tender.type || '')}</span>`]
+                .concat((tender.matched_categories || []).map(cat => `<span class="tag tag-category">${escapeHtml(cat)}</span>`))
+                .concat((tender.matched_keywords || []).map(kw => `<span class="tag tag-keyword">${escapeHtml(kw)}</span>`));
+            return '<div class="tender-card">' +
+                '<div class="tender-header">' +
+                `<div class="tender-title">${escapeHtml(tender.title || '')}</div>` +
+                `<div class="tender-date">${escapeHtml(date.slice(0, 4))}/${escapeHtml(date.slice(4, 6))}/${escapeHtml(date.slice(6, 8))}</div>` +
+                '</div>' +
+                '<div class="tender-meta">' +
+                `<div class="meta-item"><span>🏛️</span><span>${escapeHtml(tender.unit_name || '未知機關')}</span></div>` +
+                `<div class="meta-item"><span>📋</span><span>${escapeHtml(tender.job_number ?? '')}</span></div>` +
+                '</div>' +
+                `<div class="tender-tags">${tags.join('')}</div>` +
+                '<div class="tender-actions">' +
+                `<a href="${escapeHtml(url)}" target="_blank" class="btn btn-primary"><span>查看詳情</span><span>→</span></a>` +
+                `<button class="btn btn-bookmark" onclick="toggleBookmark(${index})"><span>☆ 加入書籤</span></button>` +
+                '</div>' +
+                '</div>';
+        }
+        
+        // 卡片於載入時一次產生，之後篩選只切換顯示；這裡記錄各卡片目前的顯示與書籤狀態
+        document.getElementById('tenderList').insertAdjacentHTML('beforeend', tenders.map((t, i) => renderCard(i, t)).join(''));
+        const cards = document.querySelectorAll('#tenderList .tender-card');
+        const allIndices = tenders.map((t, i) => i);
+        const shown = new Uint8Array(tenders.length).fill(1);
+        const cardBookmarked = new Uint8Array(tenders.length);
+        // 已收藏卡片的備註按鈕與備註區塊（依卡片索引）
+        const noteNodes = new Map();
+        const noteButtonTemplate = document.getElementById('noteButtonTemplate').content.firstElementChild;
+        const noteTemplate = document.getElementById('noteTemplate').content.firstElementChild;
+        
         // 檢查伺服器連線
-        async function checkConnection() {{
-            try {{
+        async function checkConnection() {
+            try {
                 const response = await fetch(API_BASE + '/bookmarks/list');
-                if (response.ok) {{
+                if (response.ok) {
                     isConnected = true;
                     const jobs = await response.json();
                     bookmarkedJobs = new Set(jobs || []);
                     updateConnectionStatus(true);
                     updateBookmarkCount();
+                    syncAllBookmarks();
                     document.getElementById('downloadBtn').style.display = bookmarkedJobs.size > 0 ? 'inline-flex' : 'none';
                     document.getElementById('exportBtn').style.display = bookmarkedJobs.size > 0 ? 'inline-flex' : 'none';
                     return true;
-                }}
-            }} catch (e) {{
+                }
+            } catch (e) {
                 console.log('伺服器未啟動');
-            }}
+            }
             isConnected = false;
             updateConnectionStatus(false);
             // 從 localStorage 讀取本地書籤
             loadLocalBookmarks();
             return false;
-        }}
+        }
         
-        function updateConnectionStatus(connected) {{
+        function updateConnectionStatus(connected) {
             const status = document.getElementById('connectionStatus');
             const text = document.getElementById('statusText');
-            if (connected) {{
+            if (connected) {
                 status.className = 'connection-status connected';
                 text.textContent = '已連接伺服器';
-            }} else {{
+            } else {
                 status.className = 'connection-status disconnected';
                 text.textContent = '離線模式（書籤儲存於本機）';
-            }}
-        }}
+            }
+        }
         
-        function loadLocalBookmarks() {{
+        function loadLocalBookmarks() {
             const saved = localStorage.getItem('tender_bookmarks');
-            if (saved) {{
+            if (saved) {
                 const data = JSON.parse(saved);
                 bookmarkedJobs = new Set(data.jobs || []);
-                bookmarkNotes = data.notes || {{}};
-            }}
+                bookmarkNotes = data.notes || {};
+            }
             updateBookmarkCount();
-        }}
+            syncAllBookmarks();
+        }
         
-        function saveLocalBookmarks() {{
-            localStorage.setItem('tender_bookmarks', JSON.stringify({{
+        function saveLocalBookmarks() {
+            localStorage.setItem('tender_bookmarks', JSON.stringify({
                 jobs: Array.from(bookmarkedJobs),
                 notes: bookmarkNotes
-            }}));
-        }}
+            }));
+        }
         
-        function updateBookmarkCount() {{
+        function updateBookmarkCount() {
             document.getElementById('bookmarkCount').textContent = bookmarkedJobs.size;
             document.getElementById('downloadBtn').style.display = bookmarkedJobs.size > 0 && isConnected ? 'inline-flex' : 'none';
             document.getElementById('exportBtn').style.display = bookmarkedJobs.size > 0 && isConnected ? 'inline-flex' : 'none';
-        }}
+        }
         
-        function showToast(message, type = 'success') {{
+        function showToast(message, type = 'success') {
             const toast = document.getElementById('toast');
             toast.textContent = message;
             toast.className = 'toast show ' + type;
-            setTimeout(() => {{
+            setTimeout(() => {
                 toast.className = 'toast';
-            }}, 3000);
-        }}
+            }, 3000);
+        }
         
-        async function toggleBookmark(jobNumber, tender) {{
+        async function toggleBookmark(index) {
+            const tender = tenders[index];
+            const jobNumber = tender.job_number;
             const isBookmarked = bookmarkedJobs.has(jobNumber);
             
-            if (isConnected) {{
-                try {{
-                    if (isBookmarked) {{
+            if (isConnected) {
+                try {
+                    if (isBookmarked) {
                         // 刪除書籤
-                        await fetch(API_BASE + '/bookmarks?job_number=' + encodeURIComponent(jobNumber), {{
+                        await fetch(API_BASE + '/bookmarks?job_number=' + encodeURIComponent(jobNumber), {
                             method: 'DELETE'
-                        }});
+                        });
                         bookmarkedJobs.delete(jobNumber);
                         showToast('已移除書籤');
-                    }} else {{
+                    } else {
                         // 新增書籤
-                        await fetch(API_BASE + '/bookmarks', {{
+                        await fetch(API_BASE + '/bookmarks', {
                             method: 'POST',
-                            headers: {{ 'Content-Type': 'application/json' }},
-                            body: JSON.stringify({{
+                            headers: { 'Content-Type': 'application/json' },
+                            body: JSON.stringify({
                                 job_number: jobNumber,
                                 title: tender.title,
                                 unit_name: tender.unit_name,
@@ -674,225 +661,229 @@ def generate_html(tenders):
                                 type: tender.type,
                                 date: tender.date,
                                 data: JSON.stringify(tender)
-                            }})
-                        }});
+                            })
+                        });
                         bookmarkedJobs.add(jobNumber);
                         showToast('已加入書籤 ⭐');
-                    }}
-                }} catch (e) {{
+                    }
+                } catch (e) {
                     showToast('操作失敗: ' + e.message, 'error');
-                }}
-            }} else {{
+                }
+            } else {
                 // 離線模式
-                if (isBookmarked) {{
+                if (isBookmarked) {
                     bookmarkedJobs.delete(jobNumber);
                     showToast('已移除書籤（本機）');
-                }} else {{
+                } else {
                     bookmarkedJobs.add(jobNumber);
                     showToast('已加入書籤（本機）⭐');
-                }}
+                }
                 saveLocalBookmarks();
-            }}
+            }
             
             updateBookmarkCount();
+            // 同一標案編號可能對應多張卡片
+            tenders.forEach((t, i) => {
+                if (t.job_number === jobNumber) {
+                    syncBookmark(i);
+                }
+            });
             renderTenders(getFilteredTenders());
-        }}
+        }
         
-        async function updateNote(jobNumber, note, priority) {{
-            if (isConnected) {{
-                try {{
-                    await fetch(API_BASE + '/bookmarks', {{
+        async function updateNote(jobNumber, note, priority) {
+            if (isConnected) {
+                try {
+                    await fetch(API_BASE + '/bookmarks', {
                         method: 'PUT',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{
+                        headers: { 'Content-Type': 'application/json' },
+                        body: JSON.stringify({
                             job_number: jobNumber,
                             note: note,
                             priority: parseInt(priority)
-                        }})
-                    }});
+                        })
+                    });
                     showToast('備註已儲存');
-                }} catch (e) {{
+                } catch (e) {
                     showToast('儲存失敗', 'error');
-                }}
-            }} else {{
-                bookmarkNotes[jobNumber] = {{ note, priority }};
+                }
+            } else {
+                bookmarkNotes[jobNumber] = { note, priority };
                 saveLocalBookmarks();
                 showToast('備註已儲存（本機）');
-            }}
-        }}
+            }
+        }
         
-        async function downloadBookmarkedTenders() {{
-            if (!isConnected) {{
+        async function downloadBookmarkedTenders() {
+            if (!isConnected) {
                 showToast('請先啟動伺服器', 'error');
                 return;
-            }}
+            }
             
             showToast('開始下載標書...');
             
-            try {{
+            try {
                 const response = await fetch(API_BASE + '/bookmarks/download');
                 const result = await response.json();
                 
                 const success = result.results.filter(r => r.status === 'success').length;
-                showToast(`下載完成！成功 ${{success}}/${{result.total}} 筆`);
-            }} catch (e) {{
+                showToast(`下載完成！成功 ${success}/${result.total} 筆`);
+            } catch (e) {
                 showToast('下載失敗: ' + e.message, 'error');
-            }}
-        }}
+            }
+        }
         
-        async function exportBookmarks() {{
-            if (!isConnected) {{
+        async function exportBookmarks() {
+            if (!isConnected) {
                 // 離線匯出
                 const data = [];
-                tenders.forEach(t => {{
-                    if (bookmarkedJobs.has(t.job_number)) {{
+                tenders.forEach(t => {
+                    if (bookmarkedJobs.has(t.job_number)) {
                         data.push(t);
-                    }}
-                }});
+                    }
+                });
                 
-                const blob = new Blob([JSON.stringify(data, null, 2)], {{ type: 'application/json' }});
+                const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
                 const url = URL.createObjectURL(blob);
                 const a = document.createElement('a');
                 a.href = url;
                 a.download = 'bookmarks_' + new Date().toISOString().slice(0,10) + '.json';
                 a.click();
                 return;
-            }}
+            }
             
             window.open(API_BASE + '/bookmarks/export', '_blank');
-        }}
+        }
         
-        function formatDate(dateNum) {{
-            const str = String(dateNum);
-            return str.slice(0, 4) + '/' + str.slice(4, 6) + '/' + str.slice(6, 8);
-        }}
-        
-        function getFilteredTenders() {{
-            let filtered = tenders;
+        function getFilteredTenders() {
+            // 類別篩選（查預先建立的索引）
+            let filtered = currentCategory === 'all' ? allIndices : (categoryIndex[currentCategory] || []);
             
             // 書籤篩選
-            if (showOnlyBookmarks) {{
-                filtered = filtered.filter(t => bookmarkedJobs.has(t.job_number));
-            }}
-            
-            // 類別篩選
-            if (currentCategory !== 'all') {{
-                filtered = filtered.filter(t => 
-                    t.matched_categories.includes(currentCategory)
-                );
-            }}
+            if (showOnlyBookmarks) {
+                filtered = filtered.filter(i => bookmarkedJobs.has(tenders[i].job_number));
+            }
             
             // 文字搜尋
-            if (searchText) {{
-                filtered = filtered.filter(t => 
-                    t.title.toLowerCase().includes(searchText) ||
-                    (t.unit_name && t.unit_name.toLowerCase().includes(searchText)) ||
-                    t.matched_keywords.some(kw => kw.toLowerCase().includes(searchText))
-                );
-            }}
+            if (searchText) {
+                filtered = filtered.filter(i => searchTexts[i].includes(searchText));
+            }
             
             return filtered;
-        }}
+        }
         
-        function renderTenders(data) {{
-            const list = document.getElementById('tenderList');
+        function renderTenders(indices) {
             const count = document.getElementById('tenderCount');
+            const noResults = document.getElementById('noResults');
             
-            if (data.length === 0) {{
-                list.innerHTML = `
-                    <div class="no-results">
-                        <div class="no-results-icon">${{showOnlyBookmarks ? '⭐' : '🔍'}}</div>
-                        <h3>${{showOnlyBookmarks ? '尚無書籤' : '找不到符合條件的標案'}}</h3>
-                        <p>${{showOnlyBookmarks ? '點擊標案卡片上的「加入書籤」來收藏感興趣的標案' : '請嘗試其他搜尋條件'}}</p>
-                    </div>
-                `;
-                count.querySelector('span').innerHTML = '顯示 <strong>0</strong> 筆標案';
-                return;
-            }}
+            // 只切換顯示狀態有變動的卡片，不重建 DOM
+            const visible = new Uint8Array(tenders.length);
+            indices.forEach(i => visible[i] = 1);
+            for (let i = 0; i < cards.length; i++) {
+                if (visible[i] !== shown[i]) {
+                    cards[i].style.display = visible[i] ? '' : 'none';
+                    shown[i] = visible[i];
+                }
+            }
             
-            count.querySelector('span').innerHTML = `顯示 <strong>${{data.length}}</strong> 筆標案`;
+            if (indices.length === 0) {
+                noResults.querySelector('.no-results-icon').textContent = showOnlyBookmarks ? '⭐' : '🔍';
+                noResults.querySelector('h3').textContent = showOnlyBookmarks ? '尚無書籤' : '找不到符合條件的標案';
+                noResults.querySelector('p').textContent = showOnlyBookmarks ? '點擊標案卡片上的「加入書籤」來收藏感興趣的標案' : '請嘗試其他搜尋條件';
+                noResults.style.display = '';
+            } else {
+                noResults.style.display = 'none';
+            }
             
-            list.innerHTML = data.map(tender => {{
-                const isBookmarked = bookmarkedJobs.has(tender.job_number);
-                const tenderJson = JSON.stringify(tender).replace(/\\\\/g, '\\\\\\\\').replace(/'/g, "\\\\'");
-                return `
-                <div class="tender-card ${{isBookmarked ? 'bookmarked' : ''}}">
-                    <div class="tender-header">
-                        <div class="tender-title">${{tender.title}}</div>
-                        <div class="tender-date">${{formatDate(tender.date)}}</div>
-                    </div>
-                    
-                    <div class="tender-meta">
-                        <div class="meta-item">
-                            <span>🏛️</span>
-                            <span>${{tender.unit_name || '未知機關'}}</span>
-                        </div>
-                        <div class="meta-item">
-                            <span>📋</span>
-                            <span>${{tender.job_number}}</span>
-                        </div>
-                    </div>
-                    
-                    <div class="tender-tags">
-                        <span class="tag tag-type">${{tender.type}}</span>
-                        ${{tender.matched_categories.map(cat => `<span class="tag tag-category">${{cat}}</span>`).join('')}}
-                        ${{tender.matched_keywords.map(kw => `<span class="tag tag-keyword">${{kw}}</span>`).join('')}}
-                    </div>
-                    
-                    <div class="tender-actions">
-                        <a href="${{tender.url}}" target="_blank" class="btn btn-primary">
-                            <span>查看詳情</span>
-                            <span>→</span>
-                        </a>
-                        <button class="btn btn-bookmark ${{isBookmarked ? 'active' : ''}}" onclick='toggleBookmark("${{tender.job_number}}", ${{tenderJson}})'>
-                            <span>${{isBookmarked ? '⭐ 已收藏' : '☆ 加入書籤'}}</span>
-                        </button>
-                        ${{isBookmarked ? `<button class="btn btn-secondary" onclick="toggleNote('${{tender.job_number}}')">📝 備註</button>` : ''}}
-                    </div>
-                    
-                    ${{isBookmarked ? `
-                    <div class="bookmark-note" id="note-${{tender.job_number}}">
-                        <div class="bookmark-note-header">
-                            <span>📝 備註</span>
-                            <select class="priority-select" onchange="updateNote('${{tender.job_number}}', document.getElementById('noteText-${{tender.job_number}}').value, this.value)">
-                                <option value="0">一般</option>
-                                <option value="1">重要</option>
-                                <option value="2">非常重要</option>
-                            </select>
-                        </div>
-                        <textarea id="noteText-${{tender.job_number}}" placeholder="輸入備註..." onblur="updateNote('${{tender.job_number}}', this.value, this.parentElement.querySelector('.priority-select').value)"></textarea>
-                    </div>
-                    ` : ''}}
-                </div>
-            `}}).join('');
-        }}
-        
-        function toggleNote(jobNumber) {{
-            const note = document.getElementById('note-' + jobNumber);
-            note.classList.toggle('show');
-        }}
+            count.querySelector('strong').textContent = indices.length;
+        }
         
-        function filterTenders() {{
+        // 依書籤狀態更新單張卡片（狀態未變時不動 DOM）
+        function syncBookmark(index) {
+            const isBookmarked = bookmarkedJobs.has(tenders[index].job_number);
+            if (isBookmarked === !!cardBookmarked[index]) {
+                return;
+            }
+            cardBookmarked[index] = isBookmarked ? 1 : 0;
+            
+            const card = cards[index];
+            const btn = card.querySelector('.btn-bookmark');
+            card.classList.toggle('bookmarked', isBookmarked);
+            btn.classList.toggle('active', isBookmarked);
+            btn.firstElementChild.textContent = isBookmarked ? '⭐ 已收藏' : '☆ 加入書籤';
+            
+            if (isBookmarked) {
+                // 由 <template> 複製節點，不必每次解析 HTML 字串
+                const button = noteButtonTemplate.cloneNode(true);
+                const note = noteTemplate.cloneNode(true);
+                const select = note.querySelector('.priority-select');
+                const textarea = note.querySelector('textarea');
+                const save = () => updateNote(tenders[index].job_number, textarea.value, select.value);
+                button.onclick = () => toggleNote(index);
+                select.onchange = save;
+                textarea.onblur = save;
+                btn.after(button);
+                card.appendChild(note);
+                noteNodes.set(index, { button, note });
+            } else {
+                const { button, note } = noteNodes.get(index);
+                button.remove();
+                note.remove();
+                noteNodes.delete(index);
+            }
+        }
+        
+        function syncAllBookmarks() {
+            for (let i = 0; i < tenders.length; i++) {
+                syncBookmark(i);
+            }
+        }
+        
+        function toggleNote(index) {
+            noteNodes.get(index).note.classList.toggle('show');
+        }
+        
+        function applySearch() {
             searchText = document.getElementById('searchInput').value.toLowerCase();
             renderTenders(getFilteredTenders());
-        }}
-        
-        function setCategory(category, btn) {{
+        }
+        
+        // 輸入停頓 120ms 後，於瀏覽器閒置時才重新篩選；按 Enter 立即篩選
+        const whenIdle = window.requestIdleCallback
+            ? callback => requestIdleCallback(callback, { timeout: 200 })
+            : callback => requestAnimationFrame(callback);
+        let searchTimer = null;
+        let searchVersion = 0;
+        function filterTenders(event) {
+            clearTimeout(searchTimer);
+            const version = ++searchVersion;
+            if (event && event.key === 'Enter') {
+                applySearch();
+                return;
+            }
+            searchTimer = setTimeout(() => {
+                whenIdle(() => {
+                    if (version === searchVersion) applySearch();
+                });
+            }, 120);
+        }
+        
+        function setCategory(category, btn) {
             currentCategory = category;
             showOnlyBookmarks = false;
             
             // 更新按鈕狀態
             document.querySelectorAll('.filter-btn').forEach(b => b.classList.remove('active', 'bookmark-filter'));
-            if (btn) {{
+            if (btn) {
                 btn.classList.add('active');
-            }} else {{
+            } else {
                 document.getElementById('filterAll').classList.add('active');
-            }}
+            }
             
             renderTenders(getFilteredTenders());
-        }}
+        }
         
-        function showBookmarksOnly() {{
+        function showBookmarksOnly() {
             showOnlyBookmarks = true;
             currentCategory = 'all';
             
@@ -901,36 +892,244 @@ def generate_html(tenders):
             document.getElementById('filterBookmark').classList.add('active', 'bookmark-filter');
             
             renderTenders(getFilteredTenders());
-        }}
+        }
         
         // 初始化
-        (async function init() {{
+        (async function init() {
             await checkConnection();
-            renderTenders(tenders);
             
             // 定期檢查連線
             setInterval(checkConnection, 10000);
-        }})();
-    </script>
-</body>
-</html>
+        })();
 '''
+
+def load_tenders():
+    """
+    載入標案資料
     
-    return html
+    解析期間暫停循環垃圾回收：大量新建的 dict 會反覆觸發 GC 掃描整批已載入資料，
+    而這些資料不含循環參照，暫停後載入時間約減半。
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(INPUT_FILE, 'rb') as f:
+            return [orjson.loads(line) for line in f]
+    finally:
+        if gc_enabled:
+            gc.enable()
 
+def generate_data(tenders, f):
+    """
+    產生網頁使用的資料腳本（標案與索引），直接寫入已開啟的二進位輸出檔 f
+    
+    以 <script src> 載入而非 fetch JSON，網頁直接由本機檔案開啟（離線模式）時也能讀取。
+    
+    Returns:
+        內容雜湊（前 12 碼），網頁引用時附在網址上，資料更新後瀏覽器不會沿用舊快取
+    """
+    
+    # 類別 → 標案索引（遞增），前端切換類別時直接查表
+    category_index = defaultdict(list)
+    for i, t in enumerate(tenders):
+        for cat in dict.fromkeys(t.get('matched_categories') or ()):
+            category_index[cat].append(i)
+    
+    # 標案資料只保留前端用到的欄位；類別、關鍵字與招標類型大量重複，
+    # 改存字串表 vocab 的索引，前端載入時再還原
+    vocab = {}
+    intern = lambda value: vocab.setdefault(value, len(vocab))
+    payload = []
+    for t in tenders:
+        item = {k: t[k] for k in TENDER_FIELDS if k in t}
+        if isinstance(item.get('type'), str):
+            item['type'] = intern(item['type'])
+        for key in ('matched_categories', 'matched_keywords'):
+            if item.get(key):
+                item[key] = [intern(value) for value in item[key]]
+        payload.append(item)
+    
+    digest = hashlib.sha1()
+    for name, value in (
+        ('vocab', list(vocab)),
+        ('tenders', payload),
+        ('categoryIndex', category_index),
+    ):
+        for chunk in (f'const {name} = '.encode(), orjson.dumps(value), b';\n'):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()[:12]
+
+def generate_html(tenders, f, data_version):
+    """產生 HTML，依序直接寫入已開啟的二進位輸出檔 f；標案資料與樣式另存為獨立檔案，卡片由前端依標案資料產生"""
+    
+    # 統計各類別數量
+    category_counts = Counter(itertools.chain.from_iterable(
+        t.get('matched_categories') or () for t in tenders
+    ))
+    
+    # 樣式內容雜湊附在網址上，樣式更新後瀏覽器不會沿用舊快取
+    style_version = hashlib.sha1(STYLE.encode()).hexdigest()[:12]
+    
+    f.write(f'''<!DOCTYPE html>
+<html lang="zh-TW">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>適合公司的政府標案 - 2026年</title>
+    <link rel="stylesheet" href="{os.path.basename(STYLE_FILE)}?v={style_version}">
+</head>
+<body>
+    <div class="connection-status disconnected" id="connectionStatus">
+        <span class="status-dot"></span>
+        <span id="statusText">未連接伺服器</span>
+    </div>
+    
+    <div class="toast" id="toast"></div>
+    
+    <div class="container">
+        <header>
+            <h1>🎯 適合公司的政府標案</h1>
+            <p class="subtitle">篩選時間：{datetime.now().strftime('%Y-%m-%d %H:%M')} | 資料範圍：2026年1月</p>
+            
+            <div class="stats">
+                <div class="stat-card" onclick="setCategory('all', this)">
+                    <div class="stat-number">{len(tenders)}</div>
+                    <div class="stat-label">全部標案</div>
+                </div>
+                <div class="stat-card bookmark" onclick="showBookmarksOnly()">
+                    <div class="stat-number" id="bookmarkCount">0</div>
+                    <div class="stat-label">⭐ 書籤</div>
+                </div>
+                <div class="stat-card alt" onclick="setCategory('廣告行銷')">
+                    <div class="stat-number">{category_counts.get('廣告行銷', 0)}</div>
+                    <div class="stat-label">廣告行銷</div>
+                </div>
+                <div class="stat-card green" onclick="setCategory('軟體開發')">
+                    <div class="stat-number">{category_counts.get('軟體開發', 0)}</div>
+                    <div class="stat-label">軟體開發</div>
+                </div>
+                <div class="stat-card orange" onclick="setCategory('網站設計')">
+                    <div class="stat-number">{category_counts.get('網站設計', 0)}</div>
+                    <div class="stat-label">網站設計</div>
+                </div>
+                <div class="stat-card blue" onclick="setCategory('AI部署')">
+                    <div class="stat-number">{category_counts.get('AI部署', 0)}</div>
+                    <div class="stat-label">AI部署</div>
+                </div>
+            </div>
+        </header>
+        
+        <div class="filters">
+            <div class="search-box">
+                <input type="text" id="searchInput" placeholder="🔍 搜尋標案名稱、機關..." onkeyup="filterTenders(event)">
+            </div>
+            <div class="filter-group">
+                <button class="filter-btn active" id="filterAll" onclick="setCategory('all', this)">全部</button>
+                <button class="filter-btn" onclick="setCategory('廣告行銷', this)">廣告行銷</button>
+                <button class="filter-btn" onclick="setCategory('軟體開發', this)">軟體開發</button>
+                <button class="filter-btn" onclick="setCategory('網站設計', this)">網站設計</button>
+                <button class="filter-btn" onclick="setCategory('AI部署', this)">AI部署</button>
+                <button class="filter-btn" onclick="setCategory('視覺設計', this)">視覺設計</button>
+                <button class="filter-btn" id="filterBookmark" onclick="showBookmarksOnly()">⭐ 書籤</button>
+            </div>
+        </div>
+        
+        <div class="tender-count" id="tenderCount">
+            <span>顯示 <strong>{len(tenders)}</strong> 筆標案</span>
+            <div>
+                <button class="btn btn-download" onclick="downloadBookmarkedTenders()" id="downloadBtn" style="display:none;">
+                    📥 下載書籤標書
+                </button>
+                <button class="btn btn-secondary" onclick="exportBookmarks()" id="exportBtn" style="display:none;">
+                    📤 匯出書籤
+                </button>
+            </div>
+        </div>
+        
+        <div class="tender-list" id="tenderList">
+            <div class="no-results" id="noResults" style="display:none;">
+                <div class="no-results-icon"></div>
+                <h3></h3>
+                <p></p>
+            </div>
+'''.encode())
+    f.write(f'''        </div>
+    </div>
+    
+    <template id="noteButtonTemplate">
+        <button class="btn btn-secondary">📝 備註</button>
+    </template>
+    
+    <template id="noteTemplate">
+        <div class="bookmark-note">
+            <div class="bookmark-note-header">
+                <span>📝 備註</span>
+                <select class="priority-select">
+                    <option value="0">一般</option>
+                    <option value="1">重要</option>
+                    <option value="2">非常重要</option>
+                </select>
+            </div>
+            <textarea placeholder="輸入備註..."></textarea>
+        </div>
+    </template>
+    
+    <script src="{os.path.basename(DATA_FILE)}?v={data_version}"></script>
+    <script>
+        const API_BASE = 'http://localhost:8080/api';'''.encode())
+    f.write(SCRIPT.encode())
+    f.write(b'''    </script>
+</body>
+</html>
+''')
+
+
+def output_files():
+    """main() 產生的所有輸出檔"""
+    return [path + suffix for path in (OUTPUT_FILE, DATA_FILE, STYLE_FILE) for suffix in ('', '.gz')]
+
+def is_up_to_date():
+    """輸出檔皆存在，且都比輸入資料與本程式新"""
+    outputs = output_files()
+    if not all(os.path.exists(path) for path in outputs):
+        return False
+    newest_source = max(os.path.getmtime(INPUT_FILE), os.path.getmtime(__file__))
+    return min(map(os.path.getmtime, outputs)) >= newest_source
 
 def main():
+    """主程式"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='產生標案瀏覽網頁')
+    parser.add_argument('--force', action='store_true', help='輸入資料未更新時也重新產生網頁')
+    args = parser.parse_args()
+    
+    if not args.force and is_up_to_date():
+        print(f"✓ 網頁已是最新，略過產生: {OUTPUT_FILE}（加 --force 可強制重新產生）")
+        return
+    
     print("載入標案資料...")
     tenders = load_tenders()
     print(f"共 {len(tenders)} 筆")
     
     print("產生網頁...")
-    html = generate_html(tenders)
+    # 先寫入暫存檔再改名，中途失敗時不會留下比輸入資料新的殘缺檔案而被誤判為最新
+    with open(DATA_FILE + '.tmp', 'wb') as f:
+        data_version = generate_data(tenders, f)
+    Path(STYLE_FILE + '.tmp').write_text(textwrap.dedent(STYLE).lstrip('\n'), encoding='utf-8')
+    with open(OUTPUT_FILE + '.tmp', 'wb') as f:
+        generate_html(tenders, f, data_version)
+    for path in (DATA_FILE, STYLE_FILE, OUTPUT_FILE):
+        os.replace(path + '.tmp', path)
     
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write(html)
+    # 另存預先壓縮的版本，靜態伺服器可直接送出，不必每次請求重新壓縮
+    for path in (OUTPUT_FILE, DATA_FILE, STYLE_FILE):
+        with open(path, 'rb') as src, gzip.open(path + '.gz.tmp', 'wb', compresslevel=9) as gz:
+            shutil.copyfileobj(src, gz, 1 << 20)
+        os.replace(path + '.gz.tmp', path + '.gz')
     
-    print(f"✓ 網頁已產生: {OUTPUT_FILE}")
+    print(f"✓ 網頁已產生: {OUTPUT_FILE}，資料檔: {DATA_FILE}，樣式: {STYLE_FILE}（皆另有 .gz）")
 
 
 if __name__ == "__main__":
@@ -4,9 +4,13 @@
 將 all_tenders.jsonl 按照年份和類別拆分成多個檔案
 """
 
-import json
+import gzip
+import orjson
 import os
+import shutil
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -14,6 +18,15 @@ from datetime import datetime
 SOURCE_FILE = "pcc_data/all_tenders.jsonl"
 OUTPUT_DIR = "pcc_data/categorized"
 
+# 來源檔小於此大小時不啟動多行程，直接單行程拆分
+PARALLEL_SPLIT_MIN_SIZE = 64 << 20
+
+# 各輸出檔的行先累積在記憶體，累積超過此行數後統一寫出一次
+FLUSH_LINES = 200000
+
+# 進度顯示間隔（秒）
+PROGRESS_INTERVAL = 1.0
+
 # 主要分類對應
 MAIN_CATEGORIES = {
     "工程類": "engineering",      # 工程類
@@ -21,14 +34,23 @@ MAIN_CATEGORIES = {
     "勞務類": "services",         # 勞務類
 }
 
+# 英文分類名稱對應回中文（含其他）
+CATEGORY_NAMES = {en_name: cn_name for cn_name, en_name in MAIN_CATEGORIES.items()}
+CATEGORY_NAMES["other"] = "其他"
+
+# 年份字串快取（1990 ~ 2099）
+YEAR_CACHE = {year: str(year) for year in range(1990, 2100)}
+
 def get_main_category(category_str):
     """從分類字串中提取主要分類"""
     if not category_str:
         return "other", "其他"
     
-    for cn_name, en_name in MAIN_CATEGORIES.items():
-        if category_str.startswith(cn_name):
-            return en_name, cn_name
+    # 分類名稱皆為 3 字，直接以前 3 字查表
+    cn_name = category_str[:3]
+    en_name = MAIN_CATEGORIES.get(cn_name)
+    if en_name is not None:
+        return en_name, cn_name
     
     return "other", "其他"
 
@@ -36,8 +58,149 @@ def get_year(date_int):
     """從日期整數中提取年份"""
     if not date_int:
         return "unknown"
+    # YYYYMMDD 整數直接以整除取年份，重複使用同一個年份字串
+    if isinstance(date_int, int):
+        year = YEAR_CACHE.get(date_int // 10000)
+        if year is not None:
+            return year
     return str(date_int)[:4]
 
+def open_jsonl(path, mode):
+    """以二進位模式開啟輸出檔；副檔名為 .gz 時以 gzip 寫入（壓縮等級與下載腳本相同）"""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode, compresslevel=3)
+    return open(path, mode, buffering=1 << 20)
+
+def flush_buffers(base_dir, buffers, written, suffix=".jsonl"):
+    """
+    將各輸出檔緩衝的行一次寫出並清空
+    
+    Args:
+        base_dir: 輸出根目錄
+        buffers: {(分類英文名, 年份): 行列表}
+        written: {(分類英文名, 年份): 本次執行已寫出行數}；首次寫入時覆寫舊檔，之後追加
+        suffix: 年份之後的檔名後綴，如 .jsonl、.part0.jsonl；以 .gz 結尾時以 gzip 壓縮寫出
+    """
+    for file_key, lines in buffers.items():
+        if lines:
+            main_cat_en, year = file_key
+            mode = 'ab' if file_key in written else 'wb'
+            with open_jsonl(base_dir / main_cat_en / f"{year}{suffix}", mode) as fh:
+                fh.writelines(lines)
+            written[file_key] = written.get(file_key, 0) + len(lines)
+            lines.clear()
+
+def _split_range(args):
+    """
+    將來源檔 [start, end) 位元組範圍內的行依分類與年份寫入輸出檔（可於子行程中執行）
+    
+    Args:
+        args: (source_file, start, end, base_dir, suffix, verbose)；start/end 須對齊行首，
+              輸出檔名為 {年份}{suffix}，verbose 時即時顯示進度與警告
+    
+    Returns:
+        (stats, {寫入的 (分類英文名, 年份): 行數}, 行數, 錯誤數, 前 5 筆錯誤 [(行號, 警告訊息或 None)])，
+        行號自本段第一行起算
+    """
+    source_file, start, end, base_dir, suffix, verbose = args
+    
+    # 各輸出檔的待寫出行，不長時間持有檔案句柄
+    buffers = defaultdict(list)
+    written = {}
+    
+    error_count = 0
+    first_errors = []
+    line_count = 0
+    pending = 0
+    next_report = time.monotonic() + PROGRESS_INTERVAL
+    
+    # 迴圈內常用的函式先綁定為區域變數
+    loads = orjson.loads
+    category_get = MAIN_CATEGORIES.get
+    year_get = YEAR_CACHE.get
+    
+    try:
+        # 以二進位模式讀取（8 MiB 緩衝），省去逐行 UTF-8 解碼，原始位元組直接寫出
+        with open(source_file, 'rb', buffering=8 << 20) as f:
+            f.seek(start)
+            remaining = end - start
+            # 每次讀入約 16 MiB 的行
+            while remaining > 0:
+                lines = f.readlines(min(remaining, 1 << 24))
+                if not lines:
+                    break
+                # readlines 可能多讀到 end 之後的行（屬於下一段），丟掉
+                size_read = sum(map(len, lines))
+                while size_read > remaining:
+                    size_read -= len(lines.pop())
+                remaining -= size_read
+                
+                for line_num, line in enumerate(lines, line_count + 1):
+                    try:
+                        data = loads(line)
+                        
+                        # 取得分類資訊（同 get_main_category，直接內嵌）
+                        category_str = data.get('brief', {}).get('category', '')
+                        main_cat_en = category_get(category_str[:3], "other") if category_str else "other"
+                        
+                        # 取得年份（常見的 YYYYMMDD 整數直接查快取，其餘交給 get_year）
+                        date = data.get('date')
+                        year = (year_get(date // 10000) if type(date) is int else None) or get_year(date)
+                        
+                        # 加入該檔的緩衝（檔案路徑於寫出時才組出；統計於寫出時依行數累計）
+                        buffers[main_cat_en, year].append(line)
+                        
+                    except orjson.JSONDecodeError as e:
+                        error_count += 1
+                        if error_count <= 5:
+                            first_errors.append((line_num, None))
+                    except Exception as e:
+                        error_count += 1
+                        if error_count <= 5:
+                            first_errors.append((line_num, str(e)))
+                            if verbose:
+                                print(f"  警告: 第 {line_num} 行處理錯誤: {e}")
+                line_count += len(lines)
+                
+                # 每批讀入後才檢查是否寫出緩衝與顯示進度，不在逐行迴圈內判斷
+                pending += len(lines)
+                if pending >= FLUSH_LINES:
+                    flush_buffers(base_dir, buffers, written, suffix)
+                    pending = 0
+                
+                if verbose and (now := time.monotonic()) >= next_report:
+                    print(f"  已處理 {line_count:,} 筆...")
+                    next_report = now + PROGRESS_INTERVAL
+    
+    finally:
+        # 寫出剩餘的緩衝
+        flush_buffers(base_dir, buffers, written, suffix)
+    
+    # 統計資訊：各輸出檔的行數即為該分類、年份的筆數
+    stats = defaultdict(dict)
+    for (main_cat_en, year), count in written.items():
+        stats[CATEGORY_NAMES[main_cat_en]][year] = count
+    
+    return dict(stats), written, line_count, error_count, first_errors
+
+def append_file(out, path):
+    """將檔案內容寫入已開啟輸出檔的目前位置（支援時以 os.sendfile 在核心內複製）"""
+    with open(path, 'rb') as src:
+        if hasattr(os, 'sendfile'):
+            try:
+                offset = 0
+                size = os.fstat(src.fileno()).st_size
+                while offset < size:
+                    sent = os.sendfile(out.fileno(), src.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                return
+            except OSError:
+                # 檔案系統不支援時改以一般讀寫複製剩餘部分
+                src.seek(offset)
+        shutil.copyfileobj(src, out, 1 << 20)
+
 def create_directory_structure():
     """建立目錄結構"""
     base_dir = Path(OUTPUT_DIR)
@@ -50,8 +213,17 @@ def create_directory_structure():
     print(f"✓ 已建立目錄結構於 {base_dir}")
     return base_dir
 
-def split_tenders():
-    """執行分類拆分"""
+def split_tenders(workers=None, compress=False):
+    """
+    執行分類拆分
+    
+    大檔案依位元組範圍（對齊換行）切成 workers 段，由多個行程各自拆分成
+    分段檔，最後依序串接，輸出內容與單行程相同。
+    
+    Args:
+        workers: 行程數，預設為 CPU 核心數
+        compress: 輸出檔以 gzip 壓縮存為 {年份}.jsonl.gz；同年份另一種格式的舊檔會被移除
+    """
     print("=" * 60)
     print("政府採購標案資料分類整理")
     print("=" * 60)
@@ -61,61 +233,77 @@ def split_tenders():
     # 建立目錄
     base_dir = create_directory_structure()
     
-    # 用於追蹤檔案句柄
-    file_handles = {}
+    print(f"讀取來源檔案: {SOURCE_FILE}")
+    print("處理中...")
+    print()
     
-    # 統計資訊
-    stats = defaultdict(lambda: defaultdict(int))
-    total_count = 0
-    error_count = 0
+    ext = ".jsonl.gz" if compress else ".jsonl"
+    size = os.path.getsize(SOURCE_FILE)
+    workers = workers or os.cpu_count() or 1
     
-    try:
-        print(f"讀取來源檔案: {SOURCE_FILE}")
-        print("處理中...")
-        print()
+    if workers == 1 or size < PARALLEL_SPLIT_MIN_SIZE:
+        stats, written, _, error_count, _ = _split_range((SOURCE_FILE, 0, size, base_dir, ext, True))
+        file_keys = set(written)
+    else:
+        # 切點對齊到下一行的行首
+        offsets = [0]
+        with open(SOURCE_FILE, 'rb') as f:
+            for i in range(1, workers):
+                f.seek(max(size * i // workers, offsets[-1]))
+                f.readline()
+                offsets.append(min(f.tell(), size))
+        offsets.append(size)
+        ranges = [(s, e) for s, e in zip(offsets, offsets[1:]) if s < e]
         
-        with open(SOURCE_FILE, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                try:
-                    data = json.loads(line.strip())
-                    
-                    # 取得分類資訊
-                    category_str = data.get('brief', {}).get('category', '')
-                    main_cat_en, main_cat_cn = get_main_category(category_str)
-                    
-                    # 取得年份
-                    year = get_year(data.get('date'))
-                    
-                    # 建立檔案路徑
-                    output_file = base_dir / main_cat_en / f"{year}.jsonl"
-                    
-                    # 取得或建立檔案句柄
-                    file_key = str(output_file)
-                    if file_key not in file_handles:
-                        file_handles[file_key] = open(output_file, 'w', encoding='utf-8')
-                    
-                    # 寫入資料
-                    file_handles[file_key].write(line)
-                    
-                    # 更新統計
-                    stats[main_cat_cn][year] += 1
-                    total_count += 1
-                    
-                    # 進度顯示
-                    if line_num % 500000 == 0:
-                        print(f"  已處理 {line_num:,} 筆...")
-                        
-                except json.JSONDecodeError as e:
-                    error_count += 1
-                except Exception as e:
-                    error_count += 1
-                    if error_count <= 5:
-                        print(f"  警告: 第 {line_num} 行處理錯誤: {e}")
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            results = list(executor.map(
+                _split_range,
+                [(SOURCE_FILE, s, e, base_dir, f".part{i}{ext}", False) for i, (s, e) in enumerate(ranges)]
+            ))
+        
+        # 合併統計，警告行號換算為全檔行號（只顯示全檔前 5 筆錯誤中的警告）
+        stats = defaultdict(lambda: defaultdict(int))
+        error_count = 0
+        first_errors = []
+        line_offset = 0
+        for part_stats, _, line_count, part_error_count, part_errors in results:
+            for cn, years in part_stats.items():
+                for year, count in years.items():
+                    stats[cn][year] += count
+            error_count += part_error_count
+            first_errors.extend((line_offset + line_num, message) for line_num, message in part_errors)
+            line_offset += line_count
+        for line_num, message in first_errors[:5]:
+            if message is not None:
+                print(f"  警告: 第 {line_num} 行處理錯誤: {message}")
+        
+        # 依分段順序串接：第一個分段檔直接改名為輸出檔，其餘分段檔追加在後
+        # （gzip 檔可直接串接，解壓後即為依序相接的內容）
+        file_keys = set().union(*(written for _, written, _, _, _ in results))
+        for file_key in file_keys:
+            main_cat_en, year = file_key
+            output_file = base_dir / main_cat_en / f"{year}{ext}"
+            part_paths = [
+                base_dir / main_cat_en / f"{year}.part{i}{ext}"
+                for i, (_, written, _, _, _) in enumerate(results)
+                if file_key in written
+            ]
+            os.replace(part_paths[0], output_file)
+            # 不以 'ab' 開啟：Linux 的 sendfile 不接受 O_APPEND 的目的檔，改為移到檔尾再寫入
+            with open(output_file, 'r+b', buffering=0) as out:
+                out.seek(0, os.SEEK_END)
+                for part_path in part_paths[1:]:
+                    append_file(out, part_path)
+                    os.remove(part_path)
     
-    finally:
-        # 關閉所有檔案句柄
-        for fh in file_handles.values():
-            fh.close()
+    # 移除先前以另一種格式（壓縮／未壓縮）輸出的同年份舊檔，避免與本次輸出並存
+    stale_ext = ".jsonl" if compress else ".jsonl.gz"
+    for main_cat_en, year in file_keys:
+        stale_file = base_dir / main_cat_en / f"{year}{stale_ext}"
+        if stale_file.exists():
+            os.remove(stale_file)
+    
+    total_count = sum(sum(years.values()) for years in stats.values())
     
     print()
     print("=" * 60)
@@ -131,22 +319,33 @@ def split_tenders():
     print("分類統計")
     print("=" * 60)
     
+    # 各分類的年份只排序一次，統計報告與索引文件共用
+    sorted_years = {category: sorted(years) for category, years in stats.items()}
+    
     for category in ["工程類", "財物類", "勞務類", "其他"]:
         if category in stats:
             cat_total = sum(stats[category].values())
             en_name = MAIN_CATEGORIES.get(category, "other")
             print(f"\n【{category}】({en_name}/) - 共 {cat_total:,} 筆")
-            for year in sorted(stats[category].keys()):
+            for year in sorted_years[category]:
                 count = stats[category][year]
                 print(f"  {year}: {count:,} 筆")
     
     # 建立索引文件
-    create_index(base_dir, stats)
+    create_index(base_dir, stats, sorted_years, ext)
     
     return stats
 
-def create_index(base_dir, stats):
-    """建立分類索引 README"""
+def create_index(base_dir, stats, sorted_years=None, ext=".jsonl"):
+    """
+    建立分類索引 README
+    
+    Args:
+        sorted_years: {分類: 已排序的年份列表}，未提供時自行排序
+        ext: 資料檔副檔名（.jsonl 或 .jsonl.gz）
+    """
+    if sorted_years is None:
+        sorted_years = {category: sorted(years) for category, years in stats.items()}
     readme_path = base_dir / "README.md"
     
     with open(readme_path, 'w', encoding='utf-8') as f:
@@ -164,7 +363,10 @@ def create_index(base_dir, stats):
         f.write("```\n\n")
         
         f.write("## 資料格式\n\n")
-        f.write("每個 JSONL 檔案以年份命名（如 `2021.jsonl`），每行一筆標案資料。\n\n")
+        if ext.endswith(".gz"):
+            f.write(f"每個 JSONL 檔案以年份命名並以 gzip 壓縮（如 `2021{ext}`），每行一筆標案資料。\n\n")
+        else:
+            f.write(f"每個 JSONL 檔案以年份命名（如 `2021{ext}`），每行一筆標案資料。\n\n")
         
         f.write("### 欄位說明\n\n")
         f.write("| 欄位 | 說明 |\n")
@@ -191,7 +393,7 @@ def create_index(base_dir, stats):
                 f.write(f"共 **{cat_total:,}** 筆\n\n")
                 f.write("| 年份 | 筆數 |\n")
                 f.write("|------|------|\n")
-                for year in sorted(stats[category].keys()):
+                for year in sorted_years[category]:
                     count = stats[category][year]
                     f.write(f"| {year} | {count:,} |\n")
                 f.write("\n")
@@ -200,5 +402,18 @@ def create_index(base_dir, stats):
     
     print(f"\n✓ 已建立索引文件: {readme_path}")
 
+def main():
+    """主程式"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='政府採購標案資料分類整理')
+    parser.add_argument('--workers', type=int, default=None, help='拆分行程數（預設為 CPU 核心數）')
+    parser.add_argument('--compress', action='store_true',
+                        help='輸出檔以 gzip 壓縮（{年份}.jsonl.gz）')
+    
+    args = parser.parse_args()
+    
+    split_tenders(workers=args.workers, compress=args.compress)
+
 if __name__ == "__main__":
-    split_tenders()
+    main()